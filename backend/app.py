@@ -1,8 +1,8 @@
 import ssl_bypass  # Import this FIRST, before any other imports
 from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, FileResponse, Response, StreamingResponse, ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
 import shutil
 import os
 import time
@@ -22,11 +22,19 @@ import json
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 ssl._create_default_https_context = ssl._create_unverified_context
 
+# Async file I/O for upload writes (falls back to blocking writes if missing)
+try:
+    import aiofiles
+    AIOFILES_AVAILABLE = True
+except ImportError:
+    AIOFILES_AVAILABLE = False
+
 
 # Local imports
 from services.document_processor import DocumentProcessor
 from services.embeddings import EmbeddingService
 from services.vector_store import VectorStore
+from services.semantic_cache import SemanticCache
 from models.llm_handler import LLMHandler
 from utils.config import config
 
@@ -35,22 +43,208 @@ from database.config import init_database, check_database_connection, get_db
 from database.services import UserService, DocumentService, SearchService, LogService
 from database.models import User, Document
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import or_
 
 # Auth imports
 from auth.db_auth_handler import get_auth_handler
 from auth.models import UserCreate, UserLogin, UserResponse, Token, UserRoleUpdate, DocumentResponse, SearchQueryResponse
-from auth.dependencies import get_current_active_user, get_admin_user, get_optional_current_user
+from auth.dependencies import get_current_active_user, get_admin_user, get_optional_current_user, get_current_user_claims
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Compiled once at import - finds image filenames in LLM answers, either
+# quoted ("filename.png" / 'filename.png') or bare (may contain spaces)
+_IMAGE_FILENAME_RE = re.compile(
+    r'["\']([^"\']+\.(?:jpg|jpeg|png|gif|webp|bmp|svg))["\']'
+    r'|([\w\s\-_.]+\.(?:jpg|jpeg|png|gif|webp|bmp|svg))',
+    re.IGNORECASE
+)
+
+# Image extension checks on the /query hot path - precomputed once so the
+# per-result loops don't rebuild sets and derived lists per hit
+_IMG_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg'})
+_IMG_EXTS_NO_DOT = frozenset(ext[1:] for ext in _IMG_EXTS)
+_IMG_EXT_TUPLE = tuple(_IMG_EXTS)
+_DOC_EXTS = frozenset({'.pdf', '.docx', '.txt'})
+_ALLOWED_EXTS = _IMG_EXTS | _DOC_EXTS
+
+# Extension -> MIME type for image serving (avoids a Path allocation and
+# suffix parse per request)
+_IMG_MIME = {
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "bmp": "image/bmp",
+    "svg": "image/svg+xml",
+}
+
+# Cache of filesystem existence checks so /query doesn't issue a stat()
+# syscall per candidate image on every request. Entries expire after a short
+# TTL and are invalidated explicitly on upload/delete.
+_PATH_EXISTS_CACHE: Dict[str, tuple] = {}  # path -> (exists, checked_at)
+_PATH_EXISTS_TTL = 60.0
+
+# Traceback formatting is expensive; when an endpoint fails repeatedly (e.g.
+# an upstream API rate-limiting us) only the first error in each window
+# carries the full traceback, the rest log the message alone
+_ERROR_LOG_SEEN: Dict[str, float] = {}  # error signature -> last traceback time
+_ERROR_LOG_WINDOW = 60.0
+
+def log_error_rate_limited(key: str, message: str):
+    """Log an error, attaching the traceback at most once per window per key"""
+    now = time.time()
+    last = _ERROR_LOG_SEEN.get(key)
+    if last is None or now - last >= _ERROR_LOG_WINDOW:
+        _ERROR_LOG_SEEN[key] = now
+        logger.error(message, exc_info=True)
+    else:
+        logger.error(message)
+
+def path_exists_cached(path: str) -> bool:
+    """Check file existence with a short-lived in-memory cache"""
+    now = time.time()
+    cached = _PATH_EXISTS_CACHE.get(path)
+    if cached and now - cached[1] < _PATH_EXISTS_TTL:
+        return cached[0]
+    exists = os.path.exists(path)
+    _PATH_EXISTS_CACHE[path] = (exists, now)
+    return exists
+
+def invalidate_path_cache(path: str):
+    """Drop a cached existence check after the file is written or deleted"""
+    _PATH_EXISTS_CACHE.pop(path, None)
+
+def collect_search_context(search_results: List[Dict[str, Any]]):
+    """Walk search results once, building LLM context, response sources,
+    scored image candidates, and the set of related document IDs."""
+    context_texts = []
+    sources = []
+    image_candidates = {}  # lowercased filename -> (display name, score)
+    related_document_ids = set()
+
+    for result in search_results:
+        # Extract metadata and score once per result
+        metadata = result.get("metadata") or {}
+        file_name = metadata.get("file_name", "Unknown")
+        file_type = metadata.get("file_type", "")
+        score = result.get("similarity_score", 0)
+
+        if "document_id" in metadata:
+            related_document_ids.add(metadata["document_id"])
+
+        context_texts.append(result["text"])
+        sources.append({
+            "text": result["text"][:200] + "..." if len(result["text"]) > 200 else result["text"],
+            "title": file_name,
+            "score": score,
+            "similarity_score": score,
+            "chunk_id": result.get("chunk_id", 0),
+            "file_name": file_name
+        })
+
+        # Check if this result is from an image file (C-level endswith on
+        # a precomputed tuple instead of rebuilding sets per result)
+        is_image_file = file_type.lower() in _IMG_EXTS_NO_DOT or \
+                       file_name.lower().endswith(_IMG_EXT_TUPLE)
+
+        # Record the result as an image candidate: direct image hits keep
+        # their similarity score, other files from relevant documents get
+        # the related-document score (their DB row may still be an image)
+        if file_name and file_name != "Unknown":
+            lower_name = file_name.lower()
+            candidate_score = score if is_image_file else 0.4
+            existing = image_candidates.get(lower_name)
+            if not existing or candidate_score > existing[1]:
+                image_candidates[lower_name] = (file_name, candidate_score)
+
+    return context_texts, sources, image_candidates, related_document_ids
+
+def materialize_images(db: Session, name_candidates: Dict[str, tuple],
+                       doc_id_candidates: set, seen_image_files: set) -> List[Dict[str, Any]]:
+    """Resolve image candidates into response entries in one batched DB lookup.
+
+    ``name_candidates`` maps lowercased filename -> (display name, score).
+    ``doc_id_candidates`` holds document IDs from search metadata whose files
+    should also be considered, scored as related documents. All candidates
+    share one IN query, one extension check, and one deduplication set.
+    """
+    images = []
+
+    filters = []
+    if name_candidates:
+        filters.append(Document.filename_lower.in_(list(name_candidates)))
+    if doc_id_candidates:
+        filters.append(Document.id.in_(list(doc_id_candidates)))
+    if not filters:
+        return images
+
+    documents = db.query(Document).filter(or_(*filters)).all()
+
+    docs_by_lower = {}
+    for doc in documents:
+        lower = doc.filename.lower()
+        docs_by_lower.setdefault(lower, doc)
+        # Documents matched only by ID become candidates at the
+        # related-document score
+        if lower not in name_candidates:
+            name_candidates[lower] = (doc.filename, 0.4)
+
+    for lower_name, (display_name, score) in name_candidates.items():
+        if display_name in seen_image_files:
+            continue
+
+        document = docs_by_lower.get(lower_name)
+        if not document:
+            logger.warning(f"Image candidate not found in database: {display_name}")
+            continue
+
+        file_type = document.file_type.lower() if document.file_type else ""
+        is_image = file_type in _IMG_EXTS_NO_DOT or \
+                   document.filename.lower().endswith(_IMG_EXT_TUPLE)
+        if not is_image or not document.upload_path:
+            continue
+
+        if not path_exists_cached(document.upload_path):
+            logger.warning(f"Image file not found on disk: {document.upload_path} for {display_name}")
+            continue
+
+        seen_image_files.add(display_name)
+        images.append({
+            "url": f"/api/images/{document.id}/{display_name}",
+            "filename": display_name,
+            "title": display_name,
+            "score": score
+        })
+        logger.info(f"✓ Added image to response: {display_name} (ID: {document.id})")
+
+    return images
+
+# Compiled list validators for the list endpoints: one schema dispatch per
+# request instead of a model_validate call (and validator-chain walk) per row
+_DOC_LIST_ADAPTER = TypeAdapter(List[DocumentResponse])
+_USER_LIST_ADAPTER = TypeAdapter(List[UserResponse])
+
+# Persistent HeyGen client: the status endpoint is polled frequently, so
+# reusing pooled keep-alive connections avoids a fresh TCP+TLS handshake to
+# api.heygen.com per call
+HEYGEN_CLIENT = httpx.AsyncClient(
+    headers={"X-Api-Key": config.HEYGEN_API_KEY},
+    timeout=httpx.Timeout(30.0, connect=5.0),
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="LLAMA 4 RAG API",
     description="RAG system with LLAMA 4 for document Q&A",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes responses several times faster than stdlib json -
+    # noticeable on the row-heavy list endpoints
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -67,6 +261,7 @@ document_processor = None
 embedding_service = None
 vector_store = None
 llm_handler = None
+semantic_cache = None
 
 # Pydantic models
 class QueryRequest(BaseModel):
@@ -74,21 +269,38 @@ class QueryRequest(BaseModel):
     top_k: Optional[int] = None
     provider: Optional[str] = None  # "ollama" or "openai", defaults to config.LLM_PROVIDER
 
+class SourceItem(BaseModel):
+    text: str
+    title: str
+    score: float
+    similarity_score: float
+    chunk_id: int
+    file_name: str
+
+class ImageItem(BaseModel):
+    url: str
+    filename: str
+    title: str
+    score: float
+
 class QueryResponse(BaseModel):
     answer: str
-    sources: List[dict]
+    sources: List[SourceItem]
     query: str
     intent: Optional[str] = None  # Add intent field
-    images: Optional[List[Dict[str, Any]]] = []  # List of image URLs and metadata
+    images: Optional[List[ImageItem]] = []  # List of image URLs and metadata
 
 class HeyGenVideoRequest(BaseModel):
     video_inputs: List[Dict[str, Any]]
     test: Optional[bool] = False
 
+class BulkDeleteRequest(BaseModel):
+    ids: List[int]
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    global document_processor, embedding_service, vector_store, llm_handler
+    global document_processor, embedding_service, vector_store, llm_handler, semantic_cache
     
     try:
         logger.info("Initializing services...")
@@ -118,7 +330,11 @@ async def startup_event():
         # Get embedding dimension for vector store
         embedding_dim = embedding_service.get_embedding_dimension()
         vector_store = VectorStore(dimension=embedding_dim)
-        
+        vector_store.start_writer()
+
+        # Semantic cache lets repeated questions skip LLM generation entirely
+        semantic_cache = SemanticCache(dimension=embedding_dim)
+
         llm_handler = LLMHandler()
         
         # Test LLM connection
@@ -132,6 +348,15 @@ async def startup_event():
         logger.error(f"Error initializing services: {e}")
         raise
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending index writes and release pooled connections on shutdown"""
+    if vector_store:
+        await vector_store.stop_writer()
+    if llm_handler:
+        await llm_handler.aclose()
+    await HEYGEN_CLIENT.aclose()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -185,18 +410,15 @@ async def upload_document(
     """Upload and process a document (Admin only)"""
     try:
         # Validate file type - support documents and images
-        allowed_document_extensions = {'.pdf', '.docx', '.txt'}
-        allowed_image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg'}
-        allowed_extensions = allowed_document_extensions | allowed_image_extensions
         file_extension = Path(file.filename).suffix.lower()
-        
-        if file_extension not in allowed_extensions:
+
+        if file_extension not in _ALLOWED_EXTS:
             raise HTTPException(
-                status_code=400, 
-                detail=f"Unsupported file type. Allowed documents: {', '.join(allowed_document_extensions)}. Allowed images: {', '.join(allowed_image_extensions)}"
+                status_code=400,
+                detail=f"Unsupported file type. Allowed documents: {', '.join(_DOC_EXTS)}. Allowed images: {', '.join(_IMG_EXTS)}"
             )
-        
-        is_image = file_extension in allowed_image_extensions
+
+        is_image = file_extension in _IMG_EXTS
         
         # Check file size
         if file.size > config.MAX_FILE_SIZE:
@@ -223,9 +445,17 @@ async def upload_document(
         else:
             file_path = Path(config.UPLOAD_DIR) / file.filename
         
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
+        # Write the upload in async chunks so large files don't stall the
+        # event loop (and other in-flight /query requests)
+        if AIOFILES_AVAILABLE:
+            async with aiofiles.open(file_path, "wb") as buffer:
+                while chunk := await file.read(1 << 20):  # 1 MB chunks
+                    await buffer.write(chunk)
+        else:
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+        invalidate_path_cache(str(file_path))
+
         # Create document record in database
         document = document_service.create_document(
             filename=file.filename,
@@ -245,16 +475,18 @@ async def upload_document(
         else:
             background_tasks.add_task(process_document_background, str(file_path), document.id, db)
         
-        # Log the upload
+        # Log the upload after the response is sent - the audit insert is
+        # another Postgres round-trip that doesn't belong on the critical path
         log_service = LogService(db)
-        log_service.create_log(
+        background_tasks.add_task(
+            log_service.create_log,
             action="document_uploaded",
             user_id=current_user.id,
             resource_type="document",
             resource_id=document.id,
             details={"filename": file.filename, "file_size": file.size}
         )
-        
+
         return DocumentResponse.model_validate(document)
         
     except HTTPException:
@@ -281,13 +513,16 @@ async def process_document_background(file_path: str, document_id: int, db: Sess
         chunks = document_processor.chunk_text(text, metadata)
         logger.info(f"Created {len(chunks)} chunks")
         
-        # Generate embeddings
-        chunks_with_embeddings = embedding_service.encode_chunks(chunks)
+        # Generate embeddings (batched, off the event loop)
+        chunks_with_embeddings = await embedding_service.encode_chunks_async(chunks)
         logger.info("Generated embeddings for chunks")
         
-        # Add to vector store
-        vector_store.add_documents(chunks_with_embeddings)
+        # Add to vector store (batched with other in-flight uploads; resolves
+        # once this batch is persisted so the status update stays accurate)
+        await vector_store.add_documents_async(chunks_with_embeddings)
         logger.info("Added chunks to vector store")
+        if semantic_cache:
+            semantic_cache.bump_corpus_version()
         
         # Update document status and chunk count
         document_service.update_document_status(document_id, "completed")
@@ -296,6 +531,7 @@ async def process_document_background(file_path: str, document_id: int, db: Sess
         # Clean up uploaded file
         try:
             os.remove(file_path)
+            invalidate_path_cache(file_path)
         except:
             pass
         
@@ -316,8 +552,9 @@ async def process_image_background(file_path: str, document_id: int, db: Session
         document_service = DocumentService(db)
         document_service.update_document_status(document_id, "processing")
         
-        # Process image - extract metadata and create description
-        result = document_processor.process_image(file_path)
+        # Process image - extract metadata and create description (async
+        # OCR keeps Tesseract off the event loop)
+        result = await document_processor.process_image_async(file_path)
         text = result.get("text", "")
         metadata = result.get("metadata", {})
         
@@ -327,13 +564,15 @@ async def process_image_background(file_path: str, document_id: int, db: Session
             logger.info(f"Created {len(chunks)} chunks from image")
             
             if chunks:
-                # Generate embeddings
-                chunks_with_embeddings = embedding_service.encode_chunks(chunks)
+                # Generate embeddings (batched, off the event loop)
+                chunks_with_embeddings = await embedding_service.encode_chunks_async(chunks)
                 logger.info("Generated embeddings for image chunks")
                 
-                # Add to vector store
-                vector_store.add_documents(chunks_with_embeddings)
+                # Add to vector store (write-behind batch, awaits persistence)
+                await vector_store.add_documents_async(chunks_with_embeddings)
                 logger.info("Added image chunks to vector store")
+                if semantic_cache:
+                    semantic_cache.bump_corpus_version()
                 
                 # Update document status and chunk count
                 document_service.update_document_status(document_id, "completed")
@@ -358,7 +597,8 @@ async def process_image_background(file_path: str, document_id: int, db: Session
 
 @app.post("/query", response_model=QueryResponse)
 async def query_documents(
-    request: QueryRequest, 
+    request: QueryRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -376,9 +616,26 @@ async def query_documents(
         
         start_time = time.time()
         
-        # Generate query embedding
-        query_embedding = embedding_service.encode_single_text(question)
-        
+        # Generate query embedding (off the event loop)
+        query_embedding = await embedding_service.encode_single_text_async(question)
+
+        # Check semantic cache - semantically duplicate questions skip
+        # vector search and LLM generation entirely
+        if semantic_cache:
+            cached = semantic_cache.lookup(query_embedding)
+            if cached:
+                response_time = int((time.time() - start_time) * 1000)
+                search_service.update_search_response(
+                    search_query.id, cached["answer"], cached["sources"], response_time
+                )
+                return QueryResponse.model_construct(
+                    answer=cached["answer"],
+                    sources=cached["sources"],
+                    query=question,
+                    intent=cached.get("intent", "general"),
+                    images=cached["images"]
+                )
+
         # Search vector store
         search_results = vector_store.search(query_embedding, top_k=top_k)
         
@@ -391,225 +648,80 @@ async def query_documents(
                 response_time
             )
             
-            return QueryResponse(
+            return QueryResponse.model_construct(
                 answer="I couldn't find any relevant information in the uploaded documents to answer your question.",
                 sources=[],
                 query=question,
                 intent="unknown"
             )
         
-        # Extract context from search results
-        context_texts = []
-        sources = []
-        images = []
+        # Extract context, sources, and image candidates from search results
+        context_texts, sources, image_candidates, related_document_ids = \
+            collect_search_context(search_results)
         seen_image_files = set()  # Track images to avoid duplicates
-        seen_document_ids = set()  # Track document IDs to get all related images
-        
-        # First pass: collect context, sources, and identify related documents
-        for result in search_results:
-            context_texts.append(result["text"])
-            file_name = result.get("metadata", {}).get("file_name", "Unknown")
-            file_type = result.get("metadata", {}).get("file_type", "")
-            
-            sources.append({
-                "text": result["text"][:200] + "..." if len(result["text"]) > 200 else result["text"],
-                "title": file_name,
-                "score": result.get("similarity_score", 0),
-                "similarity_score": result.get("similarity_score", 0),
-                "chunk_id": result.get("chunk_id", 0),
-                "file_name": file_name
-            })
-            
-            # Track document IDs from metadata if available
-            metadata = result.get("metadata", {})
-            if "document_id" in metadata:
-                seen_document_ids.add(metadata["document_id"])
-            
-            # Check if this result is from an image file
-            image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg'}
-            is_image_file = file_type.lower() in [ext[1:] for ext in image_extensions] or \
-                           any(file_name.lower().endswith(ext) for ext in image_extensions)
-            
-            if is_image_file:
-                # This is an image - add to images list if not already added
-                if file_name not in seen_image_files:
-                    seen_image_files.add(file_name)
-                    # Get document to find upload path
-                    doc_service = DocumentService(db)
-                    document = doc_service.get_document_by_filename(file_name)
-                    
-                    # If exact match fails, try case-insensitive search
-                    if not document:
-                        # Try to find document with case-insensitive filename match
-                        document = db.query(Document).filter(
-                            func.lower(Document.filename) == file_name.lower()
-                        ).first()
-                        if document:
-                            logger.info(f"Found image document via case-insensitive search: {file_name} -> {document.filename}")
-                    
-                    if document and document.upload_path:
-                        # Verify file exists
-                        if Path(document.upload_path).exists():
-                            seen_document_ids.add(document.id)
-                            image_url = f"/api/images/{document.id}/{file_name}"
-                            images.append({
-                                "url": image_url,
-                                "filename": file_name,
-                                "title": file_name,
-                                "score": result.get("similarity_score", 0)
-                            })
-                            logger.info(f"✓ Added image to response: {file_name} (ID: {document.id}, URL: {image_url})")
-                        else:
-                            logger.warning(f"✗ Image file not found on disk: {document.upload_path} for {file_name}")
-                    else:
-                        if not document:
-                            logger.warning(f"✗ Document not found in database for image: {file_name}")
-                        elif not document.upload_path:
-                            logger.warning(f"✗ Document {document.id} has no upload_path for image: {file_name}")
-        
-        # Second pass: Get additional images from documents that appeared in search results
-        # This ensures we get all images from documents that are relevant to the query
-        doc_service = DocumentService(db)
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg'}
-        
-        # Get unique document IDs and filenames from search results
-        related_document_ids = set()
-        related_filenames = set()
-        for result in search_results:
-            metadata = result.get("metadata", {})
-            if "document_id" in metadata:
-                related_document_ids.add(metadata["document_id"])
-            file_name = metadata.get("file_name", "")
-            if file_name:
-                related_filenames.add(file_name)
-        
-        # Get images from documents that are related to the search results
-        # First, try to get documents by ID
-        for doc_id in related_document_ids:
-            document = doc_service.get_document_by_id(doc_id)
-            if document:
-                file_type = document.file_type.lower() if document.file_type else ""
-                is_image = file_type in [ext[1:] for ext in image_extensions] or \
-                          any(document.filename.lower().endswith(ext) for ext in image_extensions)
-                
-                if is_image and document.upload_path and document.filename not in seen_image_files:
-                    if Path(document.upload_path).exists():
-                        seen_image_files.add(document.filename)
-                        image_url = f"/api/images/{document.id}/{document.filename}"
-                        images.append({
-                            "url": image_url,
-                            "filename": document.filename,
-                            "title": document.filename,
-                            "score": 0.4  # Score for images from related documents
-                        })
-        
-        # Also get images by filename from search results
-        for filename in related_filenames:
-            if filename not in seen_image_files:
-                document = doc_service.get_document_by_filename(filename)
-                
-                # If exact match fails, try case-insensitive search
-                if not document:
-                    document = db.query(Document).filter(
-                        func.lower(Document.filename) == filename.lower()
-                    ).first()
-                
-                if document:
-                    file_type = document.file_type.lower() if document.file_type else ""
-                    is_image = file_type in [ext[1:] for ext in image_extensions] or \
-                              any(filename.lower().endswith(ext) for ext in image_extensions)
-                    
-                    if is_image and document.upload_path:
-                        if Path(document.upload_path).exists():
-                            seen_image_files.add(filename)
-                            image_url = f"/api/images/{document.id}/{filename}"
-                            images.append({
-                                "url": image_url,
-                                "filename": filename,
-                                "title": filename,
-                                "score": 0.4
-                            })
-                            logger.info(f"Added related image to response: {filename} (ID: {document.id})")
-        
+
+        # Kick off LLM generation first so the image DB work below runs
+        # concurrently with it instead of delaying it
+        provider = request.provider  # Get provider from request, or None to use config default
+        llm_task = asyncio.create_task(
+            llm_handler.generate_response_with_metadata(question, context_texts, provider=provider)
+        )
+
+        # Resolve all search-derived image candidates (direct hits and related
+        # documents) in one fused pass, run in a worker thread while the LLM
+        # generates - the lookup latency is hidden behind the much slower call
+        llm_result, images = await asyncio.gather(
+            llm_task,
+            asyncio.to_thread(
+                materialize_images, db, image_candidates, related_document_ids, seen_image_files
+            )
+        )
+
         # Sort images by score (highest first) to show most relevant images first
         images.sort(key=lambda x: x.get("score", 0), reverse=True)
-        
+
         # Limit to top 15 images to avoid overwhelming the response
         images = images[:15]
-        
-        logger.info(f"Collected {len(images)} images from search results before LLM generation")
+
+        logger.info(f"Collected {len(images)} images from search results and related documents")
         if images:
             logger.info(f"Image filenames: {[img.get('filename', 'unknown') for img in images]}")
-        
-        # Generate answer using LLM with metadata
-        provider = request.provider  # Get provider from request, or None to use config default
-        llm_result = await llm_handler.generate_response_with_metadata(question, context_texts, provider=provider)
-        answer = llm_result["response"]
-        intent = llm_result.get("intent", "general")
+
+        answer = llm_result.response
+        intent = llm_result.intent
         
         logger.info(f"LLM generated response. Current images count: {len(images)}")
         
         # Extract image filenames mentioned in the LLM response and add them to images array
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg'}
-        
-        # Pattern to find image filenames in the text (handles spaces and special characters)
-        # Matches: "filename.png", "filename with spaces.png", "lmkv2 abd lmkv3.png", etc.
-        # Pattern matches: word characters, spaces, hyphens, underscores, dots, followed by image extension
-        image_pattern = r'([\w\s\-_.]+\.(?:jpg|jpeg|png|gif|webp|bmp|svg))'
-        mentioned_images = re.findall(image_pattern, answer, re.IGNORECASE)
-        
-        # Also try to find quoted filenames: "filename.png" or 'filename.png'
-        quoted_pattern = r'["\']([^"\']+\.(?:jpg|jpeg|png|gif|webp|bmp|svg))["\']'
-        quoted_images = re.findall(quoted_pattern, answer, re.IGNORECASE)
-        mentioned_images.extend(quoted_images)
-        
+        # Single scan with the precompiled pattern - each match is a
+        # (quoted, bare) tuple with exactly one non-empty group
+        mentioned_images = [quoted or bare for quoted, bare in _IMAGE_FILENAME_RE.findall(answer)]
+
         # Remove duplicates while preserving order
         mentioned_images = list(dict.fromkeys(mentioned_images))
         
         logger.info(f"Found {len(mentioned_images)} image filenames mentioned in response: {mentioned_images}")
         
-        # Look up mentioned images in the database and add them if not already included
-        for mentioned_filename in mentioned_images:
-            mentioned_filename = mentioned_filename.strip()
-            if mentioned_filename and mentioned_filename.lower() not in [img.get("filename", "").lower() for img in images]:
-                # Try to find the document
-                document = doc_service.get_document_by_filename(mentioned_filename)
-                
-                # If exact match fails, try case-insensitive search
-                if not document:
-                    document = db.query(Document).filter(
-                        func.lower(Document.filename) == mentioned_filename.lower()
-                    ).first()
-                
-                if document:
-                    file_type = document.file_type.lower() if document.file_type else ""
-                    is_image = file_type in [ext[1:] for ext in image_extensions] or \
-                              any(mentioned_filename.lower().endswith(ext) for ext in image_extensions)
-                    
-                    if is_image and document.upload_path:
-                        if Path(document.upload_path).exists():
-                            image_url = f"/api/images/{document.id}/{mentioned_filename}"
-                            images.append({
-                                "url": image_url,
-                                "filename": mentioned_filename,
-                                "title": mentioned_filename,
-                                "score": 0.2  # Lower score for images mentioned in text
-                            })
-                            logger.info(f"Added mentioned image to response: {mentioned_filename} (ID: {document.id})")
-                        else:
-                            logger.warning(f"Mentioned image file not found on disk: {document.upload_path}")
-                    else:
-                        logger.warning(f"Mentioned file is not an image or has no upload_path: {mentioned_filename}")
-                else:
-                    logger.warning(f"Mentioned image not found in database: {mentioned_filename}")
+        # Look up mentioned images through the same fused materializer, at a
+        # lower score since they are only referenced in the answer text
+        included_filenames = {img.get("filename", "").lower() for img in images}
+        mentioned_candidates = {
+            name.strip().lower(): (name.strip(), 0.2)
+            for name in mentioned_images
+            if name.strip() and name.strip().lower() not in included_filenames
+        }
+
+        if mentioned_candidates:
+            images.extend(materialize_images(db, mentioned_candidates, set(), seen_image_files))
         
         # Update search query with response
         response_time = int((time.time() - start_time) * 1000)
         search_service.update_search_response(search_query.id, answer, sources, response_time)
         
-        # Log the query
+        # Log the query after the response is sent
         log_service = LogService(db)
-        log_service.create_log(
+        background_tasks.add_task(
+            log_service.create_log,
             action="document_query",
             user_id=current_user.id,
             resource_type="search",
@@ -622,8 +734,14 @@ async def query_documents(
             logger.info(f"Images being returned: {[(img.get('filename'), img.get('url')) for img in images]}")
         else:
             logger.warning("No images found in response - check if images exist in search results or database")
-        
-        return QueryResponse(
+
+        # Cache the generated response for semantically similar future queries
+        if semantic_cache:
+            semantic_cache.add(query_embedding, answer, sources, images, intent=intent)
+
+        # Internal data is already shaped correctly - skip Pydantic's
+        # per-field revalidation when assembling the response
+        return QueryResponse.model_construct(
             answer=answer,
             sources=sources,
             query=question,
@@ -637,10 +755,134 @@ async def query_documents(
         logger.error(f"Error processing query: {e}")
         raise HTTPException(status_code=500, detail=f"Query error: {str(e)}")
 
+@app.post("/query/stream")
+async def query_documents_stream(
+    request: QueryRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Query the document collection, streaming the answer as Server-Sent
+    Events: token events as the LLM generates, then one metadata event with
+    sources/images, then a done event."""
+    question = request.question.strip()
+    if not question:
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+
+    top_k = request.top_k or config.TOP_K_RESULTS
+
+    # Create search query record
+    search_service = SearchService(db)
+    search_query = search_service.create_search_query(current_user.id, question)
+
+    start_time = time.time()
+
+    # Generate query embedding (off the event loop)
+    query_embedding = await embedding_service.encode_single_text_async(question)
+
+    def sse_event(payload: Dict[str, Any]) -> str:
+        return f"data: {json.dumps(payload, default=str)}\n\n"
+
+    async def sse_generator():
+        try:
+            # Cached answers are emitted as a single token event
+            if semantic_cache:
+                cached = semantic_cache.lookup(query_embedding)
+                if cached:
+                    yield sse_event({"type": "token", "text": cached["answer"]})
+                    yield sse_event({
+                        "type": "metadata",
+                        "sources": cached["sources"],
+                        "images": cached["images"],
+                        "intent": cached.get("intent", "general")
+                    })
+                    yield sse_event({"type": "done"})
+                    response_time = int((time.time() - start_time) * 1000)
+                    search_service.update_search_response(
+                        search_query.id, cached["answer"], cached["sources"], response_time
+                    )
+                    return
+
+            # Search vector store
+            search_results = vector_store.search(query_embedding, top_k=top_k)
+
+            if not search_results:
+                answer = "I couldn't find any relevant information in the uploaded documents to answer your question."
+                yield sse_event({"type": "token", "text": answer})
+                yield sse_event({"type": "metadata", "sources": [], "images": [], "intent": "unknown"})
+                yield sse_event({"type": "done"})
+                response_time = int((time.time() - start_time) * 1000)
+                search_service.update_search_response(search_query.id, answer, [], response_time)
+                return
+
+            context_texts, sources, image_candidates, related_document_ids = \
+                collect_search_context(search_results)
+            seen_image_files = set()
+
+            # Resolve search-derived images concurrently with token streaming
+            images_task = asyncio.create_task(asyncio.to_thread(
+                materialize_images, db, image_candidates, related_document_ids, seen_image_files
+            ))
+
+            # Stream tokens to the client as the provider produces them
+            answer_parts = []
+            async for token in llm_handler.generate_response_stream(
+                question, context_texts, provider=request.provider
+            ):
+                answer_parts.append(token)
+                yield sse_event({"type": "token", "text": token})
+            answer = "".join(answer_parts)
+
+            images = await images_task
+
+            # Pick up images only mentioned in the answer text
+            mentioned_images = [quoted or bare for quoted, bare in _IMAGE_FILENAME_RE.findall(answer)]
+            included_filenames = {img.get("filename", "").lower() for img in images}
+            mentioned_candidates = {
+                name.strip().lower(): (name.strip(), 0.2)
+                for name in mentioned_images
+                if name.strip() and name.strip().lower() not in included_filenames
+            }
+            if mentioned_candidates:
+                images.extend(materialize_images(db, mentioned_candidates, set(), seen_image_files))
+
+            images.sort(key=lambda x: x.get("score", 0), reverse=True)
+            images = images[:15]
+
+            yield sse_event({
+                "type": "metadata",
+                "sources": sources,
+                "images": images,
+                "intent": "general"
+            })
+            yield sse_event({"type": "done"})
+
+            # Record the full response and cache it for similar queries
+            response_time = int((time.time() - start_time) * 1000)
+            search_service.update_search_response(search_query.id, answer, sources, response_time)
+
+            log_service = LogService(db)
+            log_service.create_log(
+                action="document_query",
+                user_id=current_user.id,
+                resource_type="search",
+                resource_id=search_query.id,
+                details={"query": question, "response_time_ms": response_time, "streamed": True}
+            )
+
+            if semantic_cache:
+                semantic_cache.add(query_embedding, answer, sources, images, intent="general")
+
+        except Exception as e:
+            logger.error(f"Error streaming query response: {e}")
+            yield sse_event({"type": "error", "detail": str(e)})
+
+    return StreamingResponse(sse_generator(), media_type="text/event-stream")
+
 @app.get("/images/{document_id}/{filename:path}")
 async def get_image(
     document_id: int,
     filename: str,
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -681,36 +923,56 @@ async def get_image(
             logger.error(f"Image file not found on disk: {document.upload_path}")
             raise HTTPException(status_code=404, detail=f"Image file not found: {document.upload_path}")
         
+        # Uploaded images never change in place, so let the browser cache
+        # them aggressively and answer revalidations with 304s. private:
+        # the endpoint is auth-protected, so shared/proxy caches must not
+        # store and re-serve the bytes to other clients
+        stat = file_path.stat()
+        etag = f'"{int(stat.st_mtime)}-{stat.st_size}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
         logger.info(f"Serving image: {document.upload_path}")
-        
+
         # Return the image file
+        dot = filename.rfind(".")
+        media_type = _IMG_MIME.get(filename[dot + 1:].lower(), "image/jpeg") if dot >= 0 else "image/jpeg"
         return FileResponse(
             document.upload_path,
-            media_type=f"image/{Path(filename).suffix[1:].lower()}" if Path(filename).suffix else "image/jpeg"
+            media_type=media_type,
+            headers={
+                "Cache-Control": "private, max-age=86400",
+                "ETag": etag
+            }
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error serving image: {e}", exc_info=True)
+        log_error_rate_limited(f"get_image:{type(e).__name__}", f"Error serving image: {e}")
         raise HTTPException(status_code=500, detail=f"Error serving image: {str(e)}")
 
 @app.get("/documents", response_model=List[DocumentResponse])
-async def list_documents(current_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
+async def list_documents(
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
     """List information about stored documents (Admin only)"""
     try:
         document_service = DocumentService(db)
         documents = document_service.get_all_documents()
-        
-        # Log the action
+
+        # Log the action after the response is sent
         log_service = LogService(db)
-        log_service.create_log(
+        background_tasks.add_task(
+            log_service.create_log,
             action="documents_listed",
             user_id=current_user.id,
             resource_type="document"
         )
         
-        return [DocumentResponse.model_validate(doc) for doc in documents]
+        return _DOC_LIST_ADAPTER.validate_python(documents, from_attributes=True)
         
     except Exception as e:
         logger.error(f"Error listing documents: {e}")
@@ -718,39 +980,43 @@ async def list_documents(current_user: User = Depends(get_admin_user), db: Sessi
 
 @app.delete("/documents/{document_id}")
 async def delete_document(
-    document_id: int, 
+    document_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
     """Delete a specific document and its chunks (Admin only)"""
     try:
         document_service = DocumentService(db)
-        document = document_service.get_document_by_id(document_id)
-        
-        if not document:
+
+        # DELETE ... RETURNING gives us the filename and upload path in the
+        # same round trip as the delete itself
+        row = document_service.delete_document_returning(document_id)
+
+        if row is None:
             raise HTTPException(status_code=404, detail="Document not found")
-        
+
         # Delete from vector store
-        deleted_count = vector_store.delete_by_filename(document.filename)
-        
-        # Delete from database
-        success = document_service.delete_document(document_id)
-        
-        if not success:
-            raise HTTPException(status_code=500, detail="Failed to delete document from database")
-        
-        # Log the deletion
+        deleted_count = vector_store.delete_by_filename(row.filename)
+        if semantic_cache:
+            semantic_cache.bump_corpus_version()
+
+        if row.upload_path:
+            invalidate_path_cache(row.upload_path)
+
+        # Log the deletion after the response is sent
         log_service = LogService(db)
-        log_service.create_log(
+        background_tasks.add_task(
+            log_service.create_log,
             action="document_deleted",
             user_id=current_user.id,
             resource_type="document",
             resource_id=document_id,
-            details={"filename": document.filename, "chunks_deleted": deleted_count}
+            details={"filename": row.filename, "chunks_deleted": deleted_count}
         )
-        
+
         return {
-            "message": f"Deleted document: {document.filename}",
+            "message": f"Deleted document: {row.filename}",
             "chunks_deleted": deleted_count
         }
         
@@ -760,11 +1026,55 @@ async def delete_document(
         logger.error(f"Error deleting document: {e}")
         raise HTTPException(status_code=500, detail=f"Delete error: {str(e)}")
 
+@app.post("/documents/bulk-delete")
+async def bulk_delete_documents(
+    request: BulkDeleteRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Delete several documents and their chunks in one batch (Admin only)"""
+    try:
+        document_service = DocumentService(db)
+
+        # One batched DB delete, then one vector-store pass over the
+        # returned filenames instead of per-document round trips
+        filenames = document_service.delete_many(request.ids)
+
+        if not filenames:
+            raise HTTPException(status_code=404, detail="No matching documents found")
+
+        chunks_deleted = vector_store.delete_by_filenames(filenames)
+        if semantic_cache:
+            semantic_cache.bump_corpus_version()
+
+        # Log the deletion after the response is sent
+        log_service = LogService(db)
+        background_tasks.add_task(
+            log_service.create_log,
+            action="documents_bulk_deleted",
+            user_id=current_user.id,
+            resource_type="document",
+            details={"filenames": filenames, "chunks_deleted": chunks_deleted}
+        )
+
+        return {
+            "message": f"Deleted {len(filenames)} documents",
+            "documents_deleted": len(filenames),
+            "chunks_deleted": chunks_deleted
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error bulk deleting documents: {e}")
+        raise HTTPException(status_code=500, detail=f"Bulk delete error: {str(e)}")
+
 @app.get("/models/info")
 async def get_model_info():
     """Get information about loaded models"""
     try:
-        llm_info = llm_handler.get_model_info() if llm_handler else {}
+        llm_info = await llm_handler.get_model_info() if llm_handler else {}
         embedding_info = embedding_service.get_model_info() if embedding_service else {}
         
         return {
@@ -819,8 +1129,17 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
+        # Embed profile claims so /auth/me can answer from the token alone
         access_token = auth_handler.create_access_token(
-            data={"sub": user.id, "role": user.role}
+            data={
+                "sub": user.id,
+                "role": user.role,
+                "username": user.username,
+                "email": user.email,
+                "is_active": user.is_active,
+                "created_at": user.created_at.isoformat() if user.created_at else None,
+                "last_login": user.last_login.isoformat() if user.last_login else None
+            }
         )
         
         return Token(
@@ -836,9 +1155,9 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Login error: {str(e)}")
 
 @app.get("/auth/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
-    """Get current user information"""
-    return UserResponse.model_validate(current_user)
+async def get_current_user_info(claims: dict = Depends(get_current_user_claims)):
+    """Get current user information (served from token claims, no DB hit)"""
+    return claims
 
 @app.get("/auth/users", response_model=List[UserResponse])
 async def list_users(admin_user: User = Depends(get_admin_user), db: Session = Depends(get_db)):
@@ -846,7 +1165,7 @@ async def list_users(admin_user: User = Depends(get_admin_user), db: Session = D
     try:
         auth_handler = get_auth_handler(db)
         users = auth_handler.get_all_users()
-        return [UserResponse.model_validate(user) for user in users]
+        return _USER_LIST_ADAPTER.validate_python(users, from_attributes=True)
         
     except Exception as e:
         logger.error(f"Error listing users: {e}")
@@ -900,6 +1219,7 @@ async def deactivate_user(
 @app.post("/auth/users/create", response_model=UserResponse)
 async def create_user_by_admin(
     user_data: UserCreate,
+    background_tasks: BackgroundTasks,
     admin_user: User = Depends(get_admin_user),
     db: Session = Depends(get_db)
 ):
@@ -922,9 +1242,10 @@ async def create_user_by_admin(
         # Return user data without password
         new_user = auth_handler.get_user_by_username(user_data.username)
         
-        # Log the user creation by admin
+        # Log the user creation by admin after the response is sent
         log_service = LogService(db)
-        log_service.create_log(
+        background_tasks.add_task(
+            log_service.create_log,
             action="user_created_by_admin",
             user_id=admin_user.id,
             resource_type="user",
@@ -953,9 +1274,8 @@ async def get_search_history(
         queries = search_service.get_user_search_history(current_user.id, limit)
         
         # Convert to response format with query and answer fields for frontend compatibility
-        results = []
-        for query in queries:
-            query_dict = {
+        results = [
+            {
                 "id": query.id,
                 "query_text": query.query_text,
                 "query": query.query_text,  # Add query field for frontend
@@ -964,8 +1284,11 @@ async def get_search_history(
                 "response_time_ms": query.response_time_ms,
                 "created_at": query.created_at
             }
-            results.append(SearchQueryResponse.model_validate(query_dict))
-        
+            for query in queries
+        ]
+
+        # FastAPI validates once against response_model; pre-validating the
+        # dicts we just built would only repeat that work
         return results
         
     except Exception as e:
@@ -981,8 +1304,9 @@ async def get_analytics_stats(admin_user: User = Depends(get_admin_user), db: Se
         user_service = UserService(db)
         
         search_stats = search_service.get_search_stats()
-        total_documents = len(document_service.get_all_documents())
-        total_users = len(user_service.get_all_users())
+        # SELECT count(*) instead of hydrating every row just to len() it
+        total_documents = document_service.get_document_count()
+        total_users = user_service.get_user_count()
         
         return {
             "search_stats": search_stats,
@@ -1005,12 +1329,14 @@ async def get_system_logs(
     try:
         log_service = LogService(db)
         logs = log_service.get_system_logs(limit)
-        
+
+        # log.user is eager-loaded by get_system_logs, so this triggers no SQL
         return [
             {
                 "id": log.id,
                 "action": log.action,
                 "user_id": log.user_id,
+                "username": log.user.username if log.user else None,
                 "resource_type": log.resource_type,
                 "resource_id": log.resource_id,
                 "details": log.details,
@@ -1037,44 +1363,45 @@ async def heygen_generate_video(
     try:
         # Get JSON payload from frontend
         payload = await request.json()
-        logger.info(f"HeyGen video generation request received: {json.dumps(payload, indent=2)[:500]}")
-        
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{config.HEYGEN_BASE_URL}/video/generate",
-                headers={
-                    "X-Api-Key": config.HEYGEN_API_KEY,
-                    "Content-Type": "application/json"
-                },
-                json=payload,
-                timeout=30.0  # Wait up to 30s for HeyGen to accept
-            )
-            
-            logger.info(f"HeyGen generate response status: {response.status_code}")
-            logger.info(f"HeyGen generate response: {response.text[:500]}")
-            
-            # Return HeyGen's response exactly as is
-            if response.status_code != 200:
-                logger.error(f"HeyGen API error: {response.text}")
-                raise HTTPException(status_code=response.status_code, detail=response.text)
-            
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"HeyGen video generation request received: {json.dumps(payload)[:500]}")
+
+        response = await HEYGEN_CLIENT.post(
+            f"{config.HEYGEN_BASE_URL}/video/generate",
+            json=payload,
+            timeout=30.0  # Wait up to 30s for HeyGen to accept
+        )
+
+        logger.info(f"HeyGen generate response status: {response.status_code}")
+
+        # Return HeyGen's response exactly as is
+        if response.status_code != 200:
+            logger.error(f"HeyGen API error: {response.text}")
+            raise HTTPException(status_code=response.status_code, detail=response.text)
+
+        # Log the video_id or task_id if present (body inspection only when
+        # debug logging is on; the hot path forwards bytes untouched)
+        if logger.isEnabledFor(logging.DEBUG):
             response_data = response.json()
-            # Log the video_id or task_id if present
-            if isinstance(response_data, dict):
-                if 'data' in response_data:
-                    data = response_data['data']
-                    if 'video_id' in data:
-                        logger.info(f"Video generation started, video_id: {data['video_id']}")
-                    if 'task_id' in data:
-                        logger.info(f"Video generation started, task_id: {data['task_id']}")
-            
-            return response_data
+            if isinstance(response_data, dict) and 'data' in response_data:
+                data = response_data['data']
+                if 'video_id' in data:
+                    logger.debug(f"Video generation started, video_id: {data['video_id']}")
+                if 'task_id' in data:
+                    logger.debug(f"Video generation started, task_id: {data['task_id']}")
+
+        # Pass the upstream bytes through without a parse + re-serialize cycle
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type", "application/json")
+        )
             
     except httpx.HTTPStatusError as e:
         logger.error(f"HeyGen API HTTP error: {e.response.status_code} - {e.response.text}")
         raise HTTPException(status_code=e.response.status_code, detail=e.response.text)
     except Exception as e:
-        logger.error(f"Error calling HeyGen API: {e}", exc_info=True)
+        log_error_rate_limited(f"heygen_generate:{type(e).__name__}", f"Error calling HeyGen API: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/heygen/video/{video_id}")
@@ -1090,42 +1417,37 @@ async def heygen_get_video_status(
     if not hasattr(config, 'HEYGEN_API_KEY') or not config.HEYGEN_API_KEY:
         raise HTTPException(status_code=500, detail="HeyGen API key not configured")
     
-    headers = {
-        "X-Api-Key": config.HEYGEN_API_KEY,
-        "Accept": "application/json"
-    }
-    
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Use the correct endpoint with query parameter (not path parameter)
-            url = f"https://api.heygen.com/v1/video_status.get?video_id={video_id}"
-            logger.info(f"Calling HeyGen endpoint: {url}")
-            
-            response = await client.get(url, headers=headers)
-            logger.info(f"HeyGen response status: {response.status_code}")
-            logger.info(f"HeyGen response text: {response.text[:500]}")
-            
-            if response.status_code == 200:
-                return response.json()
-            
-            # Handle error responses
-            logger.error(f"HeyGen API returned {response.status_code} for video_id: {video_id}")
-            logger.error(f"Response text: {response.text}")
-            
-            try:
-                error_detail = response.json()
-            except:
-                error_detail = response.text
-            
-            raise HTTPException(
-                status_code=response.status_code, 
-                detail={
-                    "error": f"HeyGen API returned {response.status_code}",
-                    "message": error_detail,
-                    "video_id": video_id
-                }
-            )
-            
+        # Use the correct endpoint with query parameter (not path parameter)
+        url = f"https://api.heygen.com/v1/video_status.get?video_id={video_id}"
+        logger.info(f"Calling HeyGen endpoint: {url}")
+
+        response = await HEYGEN_CLIENT.get(url, headers={"Accept": "application/json"})
+        logger.info(f"HeyGen response status: {response.status_code}")
+        logger.info(f"HeyGen response text: {response.text[:500]}")
+
+        if response.status_code == 200:
+            return response.json()
+
+        # Handle error responses
+        logger.error(f"HeyGen API returned {response.status_code} for video_id: {video_id}")
+        logger.error(f"Response text: {response.text}")
+
+        try:
+            error_detail = response.json()
+        except:
+            error_detail = response.text
+
+        raise HTTPException(
+            status_code=response.status_code,
+            detail={
+                "error": f"HeyGen API returned {response.status_code}",
+                "message": error_detail,
+                "video_id": video_id
+            }
+        )
+
+
     except HTTPException:
         raise
     except httpx.HTTPStatusError as e:
@@ -1139,9 +1461,9 @@ async def heygen_get_video_status(
             }
         )
     except Exception as e:
-        logger.error(f"Error calling HeyGen API: {e}", exc_info=True)
+        log_error_rate_limited(f"heygen_status:{type(e).__name__}", f"Error calling HeyGen API: {e}")
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail={
                 "error": "Internal server error",
                 "message": str(e)
@@ -1150,9 +1472,20 @@ async def heygen_get_video_status(
 
 if __name__ == "__main__":
     import uvicorn
+    # uvloop + httptools swap in C-accelerated event loop and HTTP parsing.
+    # Single worker on purpose: the FAISS index, its metadata, the semantic
+    # and route caches and the write-behind queue all live in process
+    # memory but persist to shared files, so with N workers an upload lands
+    # in one process, stays invisible to the others, and the next save from
+    # another worker overwrites it. Scale out only once those are
+    # multi-process safe.
     uvicorn.run(
-        app, 
-        host=config.APP_HOST, 
+        "app:app",
+        host=config.APP_HOST,
         port=config.APP_PORT,
-        log_level="info"
+        workers=1,
+        loop="uvloop",
+        http="httptools",
+        log_level="info" if config.DEBUG else "warning",
+        access_log=config.DEBUG
     )
\ No newline at end of file
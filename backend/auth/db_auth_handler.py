@@ -3,7 +3,9 @@ from jwt.exceptions import PyJWTError
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from typing import Optional, Dict, Any
+import hashlib
 import os
+import time
 from fastapi import HTTPException, status, Depends
 from sqlalchemy.orm import Session
 
@@ -19,6 +21,75 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 
+# Short-TTL auth caches. Every authenticated endpoint decodes the JWT and
+# loads the user row, so memoizing both removes a signature check and a DB
+# round trip per request. Token entries are keyed by a sha256 digest so raw
+# tokens never sit in memory; user entries hold column values (not live ORM
+# instances) so they stay valid across sessions.
+_TOKEN_CACHE: Dict[bytes, tuple] = {}  # digest -> (payload, cached_at)
+_TOKEN_CACHE_TTL = 30.0
+_TOKEN_CACHE_MAX = 10000
+
+_USER_CACHE: Dict[int, tuple] = {}  # user_id -> (column values, cached_at)
+_USER_CACHE_TTL = 60.0
+_USER_CACHE_MAX = 5000
+
+_USER_CACHED_COLUMNS = (
+    "id", "username", "email", "hashed_password", "role",
+    "is_active", "created_at", "last_login"
+)
+
+def invalidate_user_cache(user_id: int):
+    """Drop a cached user row after its account is modified"""
+    _USER_CACHE.pop(user_id, None)
+
+def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
+    """Create a JWT access token"""
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+    to_encode.update({"exp": expire})
+    # Ensure subject is a string
+    if "sub" in to_encode:
+        to_encode["sub"] = str(to_encode["sub"])
+
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """Verify and decode a JWT token (memoized for a short TTL)"""
+    digest = hashlib.sha256(token.encode()).digest()[:16]
+    now = time.time()
+    cached = _TOKEN_CACHE.get(digest)
+    if cached and now - cached[1] < _TOKEN_CACHE_TTL:
+        return cached[0]
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        user_id_str: str = payload.get("sub")
+        if user_id_str is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        # Convert string user_id back to int for database lookup
+        payload["sub"] = int(user_id_str)
+
+        if len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX:
+            _TOKEN_CACHE.clear()
+        _TOKEN_CACHE[digest] = (payload, now)
+        return payload
+    except PyJWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
 class DatabaseAuthHandler:
     def __init__(self, db: Session):
         self.db = db
@@ -38,41 +109,13 @@ class DatabaseAuthHandler:
     
     def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         """Create a JWT access token"""
-        to_encode = data.copy()
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(minutes=self.access_token_expire_minutes)
-        
-        to_encode.update({"exp": expire})
-        # Ensure subject is a string
-        if "sub" in to_encode:
-            to_encode["sub"] = str(to_encode["sub"])
-        
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
-        return encoded_jwt
-    
+        return create_access_token(data, expires_delta)
+
     def verify_token(self, token: str) -> Dict[str, Any]:
-        """Verify and decode a JWT token"""
-        try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            user_id_str: str = payload.get("sub")
-            if user_id_str is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            # Convert string user_id back to int for database lookup
-            payload["sub"] = int(user_id_str)
-            return payload
-        except PyJWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    
+        """Verify and decode a JWT token (memoized for a short TTL)"""
+        return verify_token(token)
+
+
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authenticate a user"""
         user = self.user_service.get_user_by_username(username)
@@ -85,6 +128,7 @@ class DatabaseAuthHandler:
         
         # Update last login
         self.user_service.update_last_login(user.id)
+        invalidate_user_cache(user.id)
         
         # Log login
         self.log_service.create_log(
@@ -118,14 +162,27 @@ class DatabaseAuthHandler:
         return self.user_service.get_user_by_username(username)
     
     def get_user_by_id(self, user_id: int) -> Optional[User]:
-        """Get user by ID"""
-        return self.user_service.get_user_by_id(user_id)
+        """Get user by ID (served from the short-TTL cache when fresh)"""
+        now = time.time()
+        cached = _USER_CACHE.get(user_id)
+        if cached and now - cached[1] < _USER_CACHE_TTL:
+            # Rebuild a detached instance from cached column values
+            return User(**dict(zip(_USER_CACHED_COLUMNS, cached[0])))
+
+        user = self.user_service.get_user_by_id(user_id)
+        if user:
+            values = tuple(getattr(user, col) for col in _USER_CACHED_COLUMNS)
+            if len(_USER_CACHE) >= _USER_CACHE_MAX:
+                _USER_CACHE.clear()
+            _USER_CACHE[user_id] = (values, now)
+        return user
     
     def update_user_role(self, user_id: int, role: str) -> bool:
         """Update user role (admin only)"""
         success = self.user_service.update_user_role(user_id, role)
-        
+
         if success:
+            invalidate_user_cache(user_id)
             # Log role update
             self.log_service.create_log(
                 action="role_updated",
@@ -140,8 +197,9 @@ class DatabaseAuthHandler:
     def deactivate_user(self, user_id: int) -> bool:
         """Deactivate a user (admin only)"""
         success = self.user_service.deactivate_user(user_id)
-        
+
         if success:
+            invalidate_user_cache(user_id)
             # Log user deactivation
             self.log_service.create_log(
                 action="user_deactivated",
@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 
 from database.config import get_db
 from database.models import User
-from .db_auth_handler import get_auth_handler
+from .db_auth_handler import get_auth_handler, verify_token
 
 security = HTTPBearer()
 
@@ -14,10 +14,10 @@ def get_current_user(
     db: Session = Depends(get_db)
 ) -> User:
     """Get the current authenticated user"""
-    auth_handler = get_auth_handler(db)
-    token = credentials.credentials
-    payload = auth_handler.verify_token(token)
-    
+    # Token verification is a module-level function; the handler (and its
+    # services) is only constructed for the DB-backed user lookup
+    payload = verify_token(credentials.credentials)
+
     user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(
@@ -25,7 +25,8 @@ def get_current_user(
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+    auth_handler = get_auth_handler(db)
     user = auth_handler.get_user_by_id(user_id)
     if user is None:
         raise HTTPException(
@@ -43,6 +44,52 @@ def get_current_user(
     
     return user
 
+def get_current_user_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> dict:
+    """Resolve the current user from JWT claims alone when possible.
+
+    Tokens issued at login carry the profile fields, so read-only endpoints
+    like /auth/me can answer without touching the database. Older tokens
+    without profile claims fall back to the (cached) user lookup.
+    """
+    payload = verify_token(credentials.credentials)
+
+    if payload.get("username") and payload.get("created_at"):
+        if payload.get("is_active") is False:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User account is deactivated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return {
+            "id": payload["sub"],
+            "username": payload["username"],
+            "email": payload.get("email"),
+            "role": payload.get("role", "user"),
+            "is_active": payload.get("is_active", True),
+            "created_at": payload["created_at"],
+            "last_login": payload.get("last_login"),
+        }
+
+    user = get_auth_handler(db).get_user_by_id(payload["sub"])
+    if user is None or not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "role": user.role,
+        "is_active": user.is_active,
+        "created_at": user.created_at,
+        "last_login": user.last_login,
+    }
+
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     """Get the current active user"""
     return current_user
@@ -65,13 +112,11 @@ def get_optional_current_user(
         return None
     
     try:
-        auth_handler = get_auth_handler(db)
-        token = credentials.credentials
-        payload = auth_handler.verify_token(token)
+        payload = verify_token(credentials.credentials)
         user_id = payload.get("sub")
-        
+
         if user_id:
-            user = auth_handler.get_user_by_id(user_id)
+            user = get_auth_handler(db).get_user_by_id(user_id)
             if user and user.is_active:
                 return user
     except:
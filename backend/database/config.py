@@ -1,6 +1,7 @@
 import os
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,14 +15,32 @@ DATABASE_URL = os.getenv(
 # PostgreSQL engine
 engine = create_engine(
     DATABASE_URL,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=20,
+    max_overflow=40,
     pool_pre_ping=True,
     echo=False  # Set to True for SQL debugging
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine on asyncpg for endpoints migrated off the sync service layer.
+# Async sessions run DB I/O on the event loop instead of borrowing a worker
+# thread per request; expire_on_commit=False keeps loaded attributes usable
+# after commit without a refresh round trip.
+ASYNC_DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    echo=False
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, expire_on_commit=False, class_=AsyncSession
+)
+
 # Import Base from models to ensure single Base instance
 # This must be imported after engine creation to avoid circular imports
 from database.models import Base
@@ -34,12 +53,39 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _apply_schema_migrations():
+    """Bring pre-existing tables in line with the current models.
+
+    create_all only creates missing tables - columns added to tables that
+    already exist on a deployment have to be altered in explicitly. Every
+    statement here is idempotent (IF NOT EXISTS) so re-running at each
+    startup is safe.
+    """
+    from sqlalchemy import text
+    migrations = [
+        # documents.filename_lower: generated column + index backing the
+        # case-insensitive filename lookups in the query endpoints
+        "ALTER TABLE documents ADD COLUMN IF NOT EXISTS filename_lower "
+        "varchar(255) GENERATED ALWAYS AS (lower(filename)) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_documents_filename_lower "
+        "ON documents (filename_lower)",
+    ]
+    with engine.begin() as connection:
+        for statement in migrations:
+            connection.execute(text(statement))
+
 def init_database():
     """Initialize database tables"""
     try:
         # Import all models to ensure they're registered with Base
         from database import models  # noqa: F401
         Base.metadata.create_all(bind=engine)
+        _apply_schema_migrations()
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Float, JSON, Computed
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -30,7 +30,10 @@ class Document(Base):
     __tablename__ = "documents"
     
     id = Column(Integer, primary_key=True, index=True)
-    filename = Column(String(255), nullable=False)
+    filename = Column(String(255), nullable=False, index=True)
+    # Generated column so case-insensitive filename lookups hit a B-tree
+    # index instead of a lower(filename) table scan
+    filename_lower = Column(String(255), Computed("lower(filename)", persisted=True), index=True)
     original_filename = Column(String(255), nullable=False)
     file_type = Column(String(10), nullable=False)  # pdf, docx, txt
     file_size = Column(Integer, nullable=False)
@@ -74,8 +77,9 @@ class SearchQuery(Base):
     response_text = Column(Text, nullable=True)
     sources_used = Column(JSON, nullable=True)  # Store source document info
     response_time_ms = Column(Integer, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    
+    # Indexed so history/stats ORDER BY created_at LIMIT runs an index scan
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
     # Relationships
     user = relationship("User", back_populates="search_queries")
     document = relationship("Document", back_populates="search_queries")
@@ -108,7 +112,8 @@ class SystemLog(Base):
     details = Column(JSON, nullable=True)
     ip_address = Column(String(45), nullable=True)
     user_agent = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Indexed so the newest-first log listing runs an index scan
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     
     # Relationships
     user = relationship("User")
@@ -1,8 +1,9 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, or_, desc, delete
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 import logging
+import time
 
 from .models import User, Document, DocumentChunk, SearchQuery, DocumentAccess, SystemLog
 
@@ -52,7 +53,12 @@ class UserService:
     def get_all_users(self) -> List[User]:
         """Get all users"""
         return self.db.query(User).all()
-    
+
+    def get_user_count(self) -> int:
+        """Count users server-side without hydrating rows"""
+        from sqlalchemy import func
+        return self.db.query(func.count(User.id)).scalar() or 0
+
     def update_user_role(self, user_id: int, role: str) -> bool:
         """Update user role"""
         try:
@@ -95,10 +101,26 @@ class UserService:
 
 class DocumentService:
     """Service for document operations"""
-    
+
+    # TTL cache for filename lookups, shared across requests. Column values
+    # (not ORM instances) are cached so entries never reference a closed
+    # session; a detached Document is rebuilt on each hit.
+    _filename_cache: Dict[str, tuple] = {}  # lower filename -> (values, cached_at)
+    _FILENAME_CACHE_TTL = 300.0
+    _FILENAME_CACHE_MAX = 4096
+    _CACHED_COLUMNS = (
+        "id", "filename", "original_filename", "file_type", "file_size",
+        "upload_path", "processing_status", "total_chunks", "uploaded_by"
+    )
+
     def __init__(self, db: Session):
         self.db = db
-    
+
+    @classmethod
+    def invalidate_filename_cache(cls, filename: str):
+        """Drop a cached filename lookup after the document changes"""
+        cls._filename_cache.pop(filename, None)
+
     def create_document(self, filename: str, original_filename: str, file_type: str, 
                        file_size: int, upload_path: str, uploaded_by: int) -> Optional[Document]:
         """Create a new document record"""
@@ -115,6 +137,7 @@ class DocumentService:
             self.db.add(document)
             self.db.commit()
             self.db.refresh(document)
+            self.invalidate_filename_cache(filename)
             return document
         except Exception as e:
             logger.error(f"Error creating document: {e}")
@@ -126,12 +149,27 @@ class DocumentService:
         return self.db.query(Document).filter(Document.id == document_id).first()
     
     def get_document_by_filename(self, filename: str) -> Optional[Document]:
-        """Get document by filename"""
-        return self.db.query(Document).filter(Document.filename == filename).first()
+        """Get document by filename (cached with a TTL across requests)"""
+        cached = self._filename_cache.get(filename)
+        if cached and time.time() - cached[1] < self._FILENAME_CACHE_TTL:
+            return Document(**dict(zip(self._CACHED_COLUMNS, cached[0])))
+
+        document = self.db.query(Document).filter(Document.filename == filename).first()
+        if document:
+            if len(self._filename_cache) >= self._FILENAME_CACHE_MAX:
+                self._filename_cache.clear()
+            values = tuple(getattr(document, col) for col in self._CACHED_COLUMNS)
+            self._filename_cache[filename] = (values, time.time())
+        return document
     
     def get_all_documents(self) -> List[Document]:
         """Get all documents"""
         return self.db.query(Document).order_by(desc(Document.created_at)).all()
+
+    def get_document_count(self) -> int:
+        """Count documents server-side without hydrating rows"""
+        from sqlalchemy import func
+        return self.db.query(func.count(Document.id)).scalar() or 0
     
     def get_user_documents(self, user_id: int) -> List[Document]:
         """Get documents uploaded by a specific user"""
@@ -146,7 +184,9 @@ class DocumentService:
                 if error:
                     document.processing_error = error
                 document.updated_at = datetime.utcnow()
+                filename = document.filename
                 self.db.commit()
+                self.invalidate_filename_cache(filename)
                 return True
             return False
         except Exception as e:
@@ -161,7 +201,9 @@ class DocumentService:
             if document:
                 document.total_chunks = total_chunks
                 document.updated_at = datetime.utcnow()
+                filename = document.filename
                 self.db.commit()
+                self.invalidate_filename_cache(filename)
                 return True
             return False
         except Exception as e:
@@ -169,15 +211,76 @@ class DocumentService:
             self.db.rollback()
             return False
     
+    def delete_many(self, document_ids: List[int]) -> List[str]:
+        """Delete several documents and their chunks with batched IN queries.
+
+        Returns the filenames of the documents that were deleted so callers
+        can clean up the vector store in one pass.
+        """
+        if not document_ids:
+            return []
+        try:
+            rows = self.db.query(Document.id, Document.filename).filter(
+                Document.id.in_(document_ids)
+            ).all()
+            if not rows:
+                return []
+
+            ids = [row.id for row in rows]
+            self.db.query(DocumentChunk).filter(
+                DocumentChunk.document_id.in_(ids)
+            ).delete(synchronize_session=False)
+            self.db.query(Document).filter(
+                Document.id.in_(ids)
+            ).delete(synchronize_session=False)
+            self.db.commit()
+
+            for row in rows:
+                self.invalidate_filename_cache(row.filename)
+            return [row.filename for row in rows]
+        except Exception as e:
+            logger.error(f"Error bulk deleting documents: {e}")
+            self.db.rollback()
+            return []
+
+    def delete_document_returning(self, document_id: int):
+        """Delete a document and its chunks, fusing the lookup into the
+        delete with DELETE ... RETURNING.
+
+        Returns a (filename, upload_path) row, or None when no document
+        matched.
+        """
+        try:
+            self.db.query(DocumentChunk).filter(
+                DocumentChunk.document_id == document_id
+            ).delete(synchronize_session=False)
+            row = self.db.execute(
+                delete(Document)
+                .where(Document.id == document_id)
+                .returning(Document.filename, Document.upload_path)
+            ).first()
+            if row is None:
+                self.db.rollback()
+                return None
+            self.db.commit()
+            self.invalidate_filename_cache(row.filename)
+            return row
+        except Exception as e:
+            logger.error(f"Error deleting document: {e}")
+            self.db.rollback()
+            return None
+
     def delete_document(self, document_id: int) -> bool:
         """Delete a document and its chunks"""
         try:
             document = self.get_document_by_id(document_id)
             if document:
+                filename = document.filename
                 # Delete associated chunks first
                 self.db.query(DocumentChunk).filter(DocumentChunk.document_id == document_id).delete()
                 self.db.delete(document)
                 self.db.commit()
+                self.invalidate_filename_cache(filename)
                 return True
             return False
         except Exception as e:
@@ -296,6 +399,9 @@ class LogService:
         ).order_by(desc(SystemLog.created_at)).limit(limit).all()
     
     def get_system_logs(self, limit: int = 100) -> List[SystemLog]:
-        """Get system logs"""
-        return self.db.query(SystemLog).order_by(desc(SystemLog.created_at)).limit(limit).all()
+        """Get system logs with their users eager-loaded (one IN query
+        instead of a lazy load per accessed log.user)"""
+        return self.db.query(SystemLog).options(
+            selectinload(SystemLog.user)
+        ).order_by(desc(SystemLog.created_at)).limit(limit).all()
 
@@ -1,35 +1,51 @@
 #!/usr/bin/env python3
 """
-Script to download the embedding model with SSL bypass
+Script to download the embedding model, skipping the network entirely when
+the model is already present in the local cache
 """
 
-import ssl
 import os
-import urllib3
 
-# SSL bypass
-ssl._create_default_https_context = ssl._create_unverified_context
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
-# Environment variables
-os.environ['PYTHONHTTPSVERIFY'] = '0'
+# Environment variables - hf_transfer enables the Rust multi-connection
+# downloader when installed (several times faster on large shards)
+os.environ['HF_HUB_ENABLE_HF_TRANSFER'] = '1'
 os.environ['HF_HUB_DISABLE_PROGRESS_BARS'] = '1'
 
+MODEL_NAME = 'all-MiniLM-L6-v2'
+CACHE_DIR = './model_cache'
+
+def cached_model_available() -> bool:
+    """Check whether the model snapshot already exists in the local cache"""
+    try:
+        from huggingface_hub import snapshot_download
+        snapshot_download(
+            repo_id=f"sentence-transformers/{MODEL_NAME}",
+            local_files_only=True,
+            cache_dir=CACHE_DIR
+        )
+        return True
+    except Exception:
+        return False
+
 try:
     from sentence_transformers import SentenceTransformer
-    
-    print("Downloading embedding model...")
+
+    if cached_model_available():
+        print("Embedding model already cached, skipping download.")
+    else:
+        print("Downloading embedding model...")
+
     model = SentenceTransformer(
-        'all-MiniLM-L6-v2', 
-        cache_folder='./model_cache'
+        MODEL_NAME,
+        cache_folder=CACHE_DIR
     )
-    print("Model downloaded successfully!")
+    print("Model ready!")
     print(f"Model dimension: {model.get_sentence_embedding_dimension()}")
-    
+
     # Test encoding
     test_embedding = model.encode(["Hello world"])
     print(f"Test encoding successful. Shape: {test_embedding.shape}")
-    
+
 except Exception as e:
     print(f"Error downloading model: {e}")
-    print("You may need to use the dummy model approach or try a different network.")
\ No newline at end of file
+    print("You may need to use the dummy model approach or try a different network.")
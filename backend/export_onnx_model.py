@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Export the embedding model to ONNX with int8 dynamic quantization.
+
+The quantized model roughly halves memory and speeds up CPU inference;
+EmbeddingService picks it up automatically from EMBEDDING_ONNX_PATH when
+optimum[onnxruntime] is installed.
+"""
+
+import os
+import sys
+
+EXPORT_DIR = os.getenv("EMBEDDING_ONNX_PATH", "./model_cache/onnx-int8")
+MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+except ImportError:
+    print("optimum[onnxruntime] is required: pip install 'optimum[onnxruntime]'")
+    sys.exit(1)
+
+print(f"Exporting {MODEL_ID} to ONNX...")
+model = ORTModelForFeatureExtraction.from_pretrained(MODEL_ID, export=True)
+
+print("Quantizing to int8 (dynamic)...")
+quantizer = ORTQuantizer.from_pretrained(model)
+qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+quantizer.quantize(save_dir=EXPORT_DIR, quantization_config=qconfig)
+
+tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+tokenizer.save_pretrained(EXPORT_DIR)
+
+print(f"Quantized model written to {EXPORT_DIR}")
@@ -1,51 +1,141 @@
-import ollama
+import hashlib
 import httpx
-from typing import List, Dict, Any
+import json
+import time
+
+# orjson parses the Ollama NDJSON stream lines faster than stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+from typing import List, Dict, Any, AsyncIterator
 from utils import config
-from services.model_router import ModelRouter
+from services.model_router import ModelRouter, RouteResult
+
+# Exact-match response cache: identical (prompt, context, provider) requests
+# within the TTL skip the LLM entirely. Complements the semantic cache, which
+# matches similar-but-not-identical questions at the query layer.
+_RESPONSE_CACHE: Dict[str, tuple] = {}  # key -> (result, cached_at)
+_RESPONSE_CACHE_TTL = 600.0
+_RESPONSE_CACHE_MAX = 1024
 
 class LLMHandler:
     def __init__(self):
-        self.client = ollama.Client(host=config.config.OLLAMA_HOST)
         self.model = config.config.OLLAMA_MODEL
         self.model_router = ModelRouter()
+        # Persistent pooled client for async HTTP calls to Ollama - reusing
+        # keep-alive connections instead of paying TCP setup per call
+        self.http_client = httpx.AsyncClient(
+            base_url=config.config.OLLAMA_HOST,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+        )
+        # Model info changes rarely; cache it briefly so /models/info doesn't
+        # hit Ollama on every request
+        self._info_cache = None
+        self._info_ts = 0.0
+
+    async def aclose(self):
+        """Close the pooled HTTP client (called on app shutdown)"""
+        await self.http_client.aclose()
 
     async def generate_response(self, prompt: str, context: List[str] = None) -> str:
         """Generate response using intelligent model routing"""
         try:
-            # Use the model router for intelligent routing
-            result = self.model_router.route_query(prompt, context)
-            return result['response']
-            
+            # The router's async clients keep the call off the event loop
+            # without the worker-thread hop
+            result = await self.model_router.route_query_async(prompt, context)
+            return result.response
+
         except Exception as e:
             print(f"Error generating response: {e}")
             return f"Sorry, I encountered an error while generating the response: {str(e)}"
-    
-    async def generate_response_with_metadata(self, prompt: str, context: List[str] = None, provider: str = None) -> Dict[str, Any]:
+
+    async def generate_response_with_metadata(self, prompt: str, context: List[str] = None, provider: str = None) -> RouteResult:
         """Generate response with full metadata including intent classification"""
         try:
-            # Use the model router for intelligent routing
-            result = self.model_router.route_query(prompt, context, provider=provider)
+            key = hashlib.sha256(
+                (prompt + "\x1f" + "\x1f".join(context or []) + "\x1f" + (provider or "")).encode()
+            ).hexdigest()
+            now = time.time()
+            cached = _RESPONSE_CACHE.get(key)
+            if cached and now - cached[1] < _RESPONSE_CACHE_TTL:
+                return cached[0]
+
+            # Await the router's async clients so concurrent requests keep
+            # multiplexing on the loop
+            result = await self.model_router.route_query_async(
+                prompt, context, provider=provider
+            )
+
+            # Don't cache failures - the next attempt should retry the LLM
+            if result.intent != 'error':
+                if len(_RESPONSE_CACHE) >= _RESPONSE_CACHE_MAX:
+                    _RESPONSE_CACHE.clear()
+                _RESPONSE_CACHE[key] = (result, now)
             return result
-            
+
         except Exception as e:
             print(f"Error generating response: {e}")
-            return {
-                'response': f"Sorry, I encountered an error while generating the response: {str(e)}",
-                'intent': 'error',
-                'confidence': 0.0,
-                'model_used': 'none',
-                'provider': provider or 'unknown',
-                'metadata': {'error': str(e)},
-                'explanation': 'Error response'
-            }
+            return RouteResult(
+                response=f"Sorry, I encountered an error while generating the response: {str(e)}",
+                intent='error',
+                confidence=0.0,
+                model_used='none',
+                provider=provider or 'unknown',
+                metadata={'error': str(e)},
+                explanation='Error response'
+            )
     
+    async def stream_response(self, prompt: str, context: List[str] = None) -> AsyncIterator[str]:
+        """Stream response tokens from Ollama as they are generated"""
+        # Build the exact request the router's buffered path sends (same
+        # model, options, token-budgeted context and stable system prefix)
+        # so streamed and buffered calls share one server-side
+        # prompt-cache entry and model residency
+        payload = dict(self.model_router._ollama_request(prompt, context))
+        payload["stream"] = True
+
+        async with self.http_client.stream("POST", "/api/chat", json=payload, timeout=None) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                try:
+                    data = _json_loads(line)
+                except ValueError:
+                    continue
+                token = data.get("message", {}).get("content", "")
+                if token:
+                    yield token
+                if data.get("done"):
+                    break
+
+    async def generate_response_stream(self, prompt: str, context: List[str] = None,
+                                       provider: str = None) -> AsyncIterator[str]:
+        """Stream response tokens from the configured provider.
+
+        Ollama streams natively over the pooled async client; the OpenAI and
+        Azure providers stream through the router's async SDK clients, so
+        every path stays on the event loop without a worker-thread bridge.
+        """
+        resolved = (provider or config.config.LLM_PROVIDER).lower()
+        if resolved == "ollama":
+            async for token in self.stream_response(prompt, context):
+                yield token
+            return
+
+        async for token in self.model_router.route_query_stream(prompt, context, provider=resolved):
+            yield token
+
     async def test_connection(self) -> bool:
         """Test if Ollama service is available"""
         try:
-            # Try to list available models
-            models = self.client.list()
-            return True
+            # List available models over the pooled async client so health
+            # checks don't block the event loop or open a fresh connection
+            response = await self.http_client.get("/api/tags")
+            return response.status_code == 200
         except Exception as e:
             print(f"Ollama connection test failed: {e}")
             return False
@@ -56,20 +146,28 @@ class LLMHandler:
         # This is a placeholder for future implementation
         return text
     
-    def get_model_info(self) -> Dict[str, Any]:
-        """Get information about the current model"""
+    async def get_model_info(self) -> Dict[str, Any]:
+        """Get information about the current model (cached for 30s)"""
+        now = time.monotonic()
+        if self._info_cache is not None and now - self._info_ts < 30.0:
+            return self._info_cache
+
         try:
-            models = self.client.list()
-            current_model = None
-            for model in models.get('models', []):
-                if model['name'] == self.model:
-                    current_model = model
-                    break
-            return {
+            # List models over the pooled async client instead of blocking
+            # the event loop with the sync ollama client
+            response = await self.http_client.get("/api/tags")
+            response.raise_for_status()
+            models = response.json()
+            by_name = {m['name']: m for m in models.get('models', [])}
+            current_model = by_name.get(self.model)
+            info = {
                 "model_name": self.model,
                 "available": current_model is not None,
                 "model_info": current_model
             }
+            self._info_cache = info
+            self._info_ts = now
+            return info
         except Exception as e:
             return {
                 "model_name": self.model,
@@ -1,15 +1,59 @@
 import fitz  # PyMuPDF
 from docx import Document
+import numpy as np
 import tiktoken
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import functools
 import logging
+import mmap
+import zipfile
+from lxml import etree
 from utils import config
 from PIL import Image
 import os
+import tempfile
+
+# Load the BPE vocabulary from disk instead of the network on cold start
+os.environ.setdefault("TIKTOKEN_CACHE_DIR", "./model_cache/tiktoken")
 
 logger = logging.getLogger(__name__)
 
+# Page extraction is CPU-bound and independent across pages, so large PDFs
+# are fanned out to a process pool. Small PDFs stay sequential to avoid
+# paying pool startup for a handful of pages.
+PDF_PARALLEL_MIN_PAGES = 4
+PDF_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+
+# Plain-text extraction flags: keep whitespace and clip to the mediabox,
+# but skip ligature joining and image placeholder handling — the chunker
+# only needs raw text
+PDF_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+
+# WordprocessingML tags for reading DOCX text straight from the XML
+_DOCX_W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+_DOCX_P_TAG = f'{{{_DOCX_W_NS}}}p'
+_DOCX_T_TAG = f'{{{_DOCX_W_NS}}}t'
+
+def _extract_page(file_path: str, page_num: int) -> str:
+    """Extract text from a single PDF page (runs in a worker process)"""
+    with fitz.open(file_path) as doc:
+        # get_page_text skips the intermediate Page object allocation
+        return doc.get_page_text(page_num, flags=PDF_TEXT_FLAGS)
+
+@functools.lru_cache(maxsize=4)
+def _get_encoding(name: str):
+    """Load a tiktoken encoding once per process; the first load is ~100ms"""
+    return tiktoken.get_encoding(name)
+
+# Token counts memoized by chunk content. Boilerplate headers/footers
+# repeat across a corpus, and re-encoding an identical span wastes the
+# full tokenization cost each time.
+_TOKEN_COUNT_CACHE: Dict[str, int] = {}
+_TOKEN_COUNT_CACHE_MAX = 65536
+
 # OCR for text extraction from images
 try:
     import pytesseract
@@ -18,13 +62,21 @@ except ImportError:
     OCR_AVAILABLE = False
     logger.warning("pytesseract not available. OCR functionality will be disabled.")
 
+# Async OCR runs Tesseract via asyncio subprocesses so multiple images
+# can be recognized concurrently without blocking the event loop
+try:
+    import aiopytesseract
+    AIOPYTESSERACT_AVAILABLE = True
+except ImportError:
+    AIOPYTESSERACT_AVAILABLE = False
+
 class DocumentProcessor:
     def __init__(self):
         self.chunk_size = config.config.CHUNK_SIZE
         self.chunk_overlap = config.config.CHUNK_OVERLAP
-        # Initialize tokenizer for token counting
+        # Initialize tokenizer for token counting (cached at module scope)
         try:
-            self.tokenizer = tiktoken.get_encoding("cl100k_base")
+            self.tokenizer = _get_encoding("cl100k_base")
         except Exception:
             self.tokenizer = None
     
@@ -58,14 +110,30 @@ class DocumentProcessor:
             "file_type": "pdf",
             "pages": 0
         }
-        
+
         try:
             with fitz.open(file_path) as doc:
-                metadata["pages"] = len(doc)
-                for page_num in range(len(doc)):
-                    page = doc.load_page(page_num)
-                    text_content += page.get_text()
-                    text_content += "\n\n"
+                page_count = len(doc)
+                metadata["pages"] = page_count
+                if page_count < PDF_PARALLEL_MIN_PAGES:
+                    # Collect page texts and join once; += on str is quadratic
+                    parts = [
+                        doc.get_page_text(page_num, flags=PDF_TEXT_FLAGS)
+                        for page_num in range(page_count)
+                    ]
+                    text_content = "".join(f"{t}\n\n" for t in parts)
+
+            if page_count >= PDF_PARALLEL_MIN_PAGES:
+                # Document is reopened per worker; only page text crosses
+                # process boundaries. executor.map keeps results in page order.
+                with ProcessPoolExecutor(max_workers=PDF_MAX_WORKERS) as executor:
+                    page_texts = executor.map(
+                        _extract_page,
+                        [str(file_path)] * page_count,
+                        range(page_count),
+                        chunksize=max(1, page_count // (PDF_MAX_WORKERS * 4))
+                    )
+                    text_content = "".join(f"{t}\n\n" for t in page_texts)
         except Exception as e:
             raise Exception(f"Error reading PDF: {e}")
         
@@ -84,16 +152,29 @@ class DocumentProcessor:
         }
         
         try:
-            doc = Document(file_path)
+            # Walk word/document.xml directly for the text-only path;
+            # python-docx builds a rich Paragraph object (runs, formatting,
+            # lazy XML accessors) per entry just to expose .text
             paragraphs = []
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    paragraphs.append(paragraph.text)
-                    text_content += paragraph.text + "\n"
-            
-            metadata["paragraphs"] = len(paragraphs)
-        except Exception as e:
-            raise Exception(f"Error reading DOCX: {e}")
+            with zipfile.ZipFile(file_path) as archive:
+                with archive.open('word/document.xml') as document_xml:
+                    for _, element in etree.iterparse(document_xml, tag=_DOCX_P_TAG):
+                        text = ''.join(t.text for t in element.iter(_DOCX_T_TAG) if t.text)
+                        if text.strip():
+                            paragraphs.append(text)
+                        element.clear()
+        except Exception as xml_error:
+            # Fall back to python-docx for files the direct reader can't handle
+            logger.warning(f"Direct DOCX read failed for {file_path.name}, falling back to python-docx: {xml_error}")
+            try:
+                doc = Document(file_path)
+                paragraphs = [p.text for p in doc.paragraphs if p.text.strip()]
+            except Exception as e:
+                raise Exception(f"Error reading DOCX: {e}")
+
+        metadata["paragraphs"] = len(paragraphs)
+        # Single join instead of += per paragraph (quadratic on big docs)
+        text_content = "\n".join(paragraphs) + ("\n" if paragraphs else "")
         
         return {
             "text": text_content,
@@ -108,12 +189,22 @@ class DocumentProcessor:
         }
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                text_content = file.read()
-        except UnicodeDecodeError:
-            # Try with different encoding
-            with open(file_path, 'r', encoding='latin-1') as file:
-                text_content = file.read()
+            # Memory-map and decode in one C call; skips the buffered I/O
+            # layer and the incremental codec a text-mode read goes through
+            with open(file_path, 'rb') as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    text_content = ""
+                else:
+                    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        raw = bytes(mm)
+                    try:
+                        text_content = raw.decode('utf-8')
+                    except UnicodeDecodeError:
+                        # Try with different encoding
+                        text_content = raw.decode('latin-1')
+                    # Text mode did newline translation; keep that behavior
+                    if '\r' in text_content:
+                        text_content = text_content.replace('\r\n', '\n').replace('\r', '\n')
         except Exception as e:
             raise Exception(f"Error reading TXT: {e}")
         
@@ -126,62 +217,196 @@ class DocumentProcessor:
         """Split text into chunks for embedding"""
         if not text.strip():
             return []
-        
+
+        # Fast path: the text fits in a single chunk, so skip boundary
+        # math, overlap handling and the batch tokenizer call entirely
+        if len(text) <= self.chunk_size:
+            chunk = {
+                "text": text.strip(),
+                "chunk_id": 0,
+                "start_pos": 0,
+                "end_pos": len(text),
+                "token_count": self._count_tokens(text.strip())
+            }
+            if metadata:
+                chunk["metadata"] = metadata
+            return [chunk]
+
+        # First pass: compute boundaries and slice out chunk strings.
+        # Simple character-based chunking with overlap; starts advance on a
+        # fixed stride computed in one arange call, so the Python loop is
+        # left with just the word-boundary rfind and the slice.
+        span_starts = []
+        span_ends = []
+        chunk_texts = []
+        text_len = len(text)
+        stride = max(1, self.chunk_size - self.chunk_overlap)
+        boundary_window = min(100, self.chunk_size // 10)
+
+        starts = np.arange(0, text_len, stride)
+        ends = np.minimum(starts + self.chunk_size, text_len)
+
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            # Try to break at word boundary if possible
+            if end < text_len:
+                # Look for the last space within reasonable distance
+                # (str.rfind runs the reverse scan in C)
+                space = text.rfind(' ', max(start, end - boundary_window), end + 1)
+                if space > start:
+                    end = space
+
+            chunk_str = text[start:end].strip()
+
+            if chunk_str:
+                # Parallel int lists instead of a tuple per span — one less
+                # allocation per chunk in the hot loop
+                span_starts.append(start)
+                span_ends.append(end)
+                chunk_texts.append(chunk_str)
+
+        # Second pass: count tokens for all chunks in one native batch call,
+        # then assemble the chunk dicts
+        token_counts = self._count_tokens_batch(chunk_texts)
+
         chunks = []
-        
-        # Simple character-based chunking with overlap
-        start = 0
+        for chunk_id, (chunk_str, chunk_start, chunk_end, token_count) in enumerate(
+            zip(chunk_texts, span_starts, span_ends, token_counts)
+        ):
+            chunk = {
+                "text": chunk_str,
+                "chunk_id": chunk_id,
+                "start_pos": chunk_start,
+                "end_pos": chunk_end,
+                "token_count": token_count
+            }
+
+            # Add metadata if provided; every chunk shares the same dict —
+            # chunk_id already lives on the chunk itself, so there is
+            # nothing per-chunk to stamp into a copy
+            if metadata:
+                chunk["metadata"] = metadata
+
+            chunks.append(chunk)
+
+        return chunks
+
+    def iter_pdf_text(self, file_path: str):
+        """Yield one PDF page's text at a time instead of the whole document"""
+        file_path = Path(file_path)
+        with fitz.open(file_path) as doc:
+            for page_num in range(len(doc)):
+                yield doc.get_page_text(page_num, flags=PDF_TEXT_FLAGS) + "\n\n"
+
+    def stream_chunk_text(self, text_iter, metadata: Dict[str, Any] = None):
+        """Chunk text incrementally from an iterator of text pieces.
+
+        Only a sliding window of roughly chunk_size + stride characters is
+        held in memory, so a large document never has to be materialized as
+        one string. Yields the same chunk dicts as chunk_text, with starts
+        advancing on the same fixed stride.
+        """
+        stride = max(1, self.chunk_size - self.chunk_overlap)
+        boundary_window = min(100, self.chunk_size // 10)
+
+        buffer = ""
+        offset = 0  # absolute position of buffer[0] in the full text
         chunk_id = 0
-        
-        while start < len(text):
-            end = start + self.chunk_size
-            
+        exhausted = False
+        pieces = iter(text_iter)
+
+        while True:
+            # Refill so the buffer covers at least one full chunk plus the
+            # next stride
+            while not exhausted and len(buffer) < self.chunk_size + stride:
+                try:
+                    buffer += next(pieces)
+                except StopIteration:
+                    exhausted = True
+
+            if not buffer:
+                break
+
+            end = min(self.chunk_size, len(buffer))
+
             # Try to break at word boundary if possible
-            if end < len(text):
-                # Look for the last space within reasonable distance
-                for i in range(min(100, self.chunk_size // 10)):
-                    if text[end - i] == ' ':
-                        end = end - i
-                        break
-            
-            chunk_text = text[start:end].strip()
-            
-            if chunk_text:
+            if end < len(buffer):
+                space = buffer.rfind(' ', max(0, end - boundary_window), end + 1)
+                if space > 0:
+                    end = space
+
+            chunk_str = buffer[:end].strip()
+            if chunk_str:
                 chunk = {
-                    "text": chunk_text,
+                    "text": chunk_str,
                     "chunk_id": chunk_id,
-                    "start_pos": start,
-                    "end_pos": end,
-                    "token_count": self._count_tokens(chunk_text) if self.tokenizer else len(chunk_text.split())
+                    "start_pos": offset,
+                    "end_pos": offset + end,
+                    "token_count": self._count_tokens(chunk_str)
                 }
-                
-                # Add metadata if provided
                 if metadata:
-                    chunk["metadata"] = metadata.copy()
-                    chunk["metadata"]["chunk_id"] = chunk_id
-                
-                chunks.append(chunk)
+                    chunk["metadata"] = metadata
+                yield chunk
                 chunk_id += 1
-            
-            # Move start position with overlap
-            start = end - self.chunk_overlap
-            if start >= len(text):
+
+            if exhausted and len(buffer) <= self.chunk_size:
                 break
-        
-        return chunks
-    
+
+            buffer = buffer[stride:]
+            offset += stride
+
     def _count_tokens(self, text: str) -> int:
-        """Count tokens in text"""
+        """Count tokens in text (memoized by content)"""
+        cached = _TOKEN_COUNT_CACHE.get(text)
+        if cached is not None:
+            return cached
+
         if self.tokenizer:
             try:
-                return len(self.tokenizer.encode(text))
+                count = len(self.tokenizer.encode(text))
+                if len(_TOKEN_COUNT_CACHE) >= _TOKEN_COUNT_CACHE_MAX:
+                    _TOKEN_COUNT_CACHE.clear()
+                _TOKEN_COUNT_CACHE[text] = count
+                return count
+            except Exception:
+                pass
+        # Fallback to an allocation-free word estimate; counting spaces is
+        # a single C pass and close enough for a rough token count
+        return text.count(' ') + 1
+
+    def _count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Count tokens for many texts at once.
+
+        encode_ordinary_batch tokenizes across native threads and releases
+        the GIL, so one call here is much cheaper than per-chunk encode.
+        Previously seen spans come from the memo cache and are not
+        re-encoded.
+        """
+        if self.tokenizer and texts:
+            try:
+                counts = [_TOKEN_COUNT_CACHE.get(t) for t in texts]
+                miss_indices = [i for i, c in enumerate(counts) if c is None]
+                if miss_indices:
+                    encoded = self.tokenizer.encode_ordinary_batch(
+                        [texts[i] for i in miss_indices],
+                        num_threads=os.cpu_count() or 1
+                    )
+                    if len(_TOKEN_COUNT_CACHE) >= _TOKEN_COUNT_CACHE_MAX:
+                        _TOKEN_COUNT_CACHE.clear()
+                    for i, tokens in zip(miss_indices, encoded):
+                        counts[i] = len(tokens)
+                        _TOKEN_COUNT_CACHE[texts[i]] = counts[i]
+                return counts
             except Exception:
                 pass
-        # Fallback to word count
-        return len(text.split())
+        # Fallback to an allocation-free word estimate
+        return [t.count(' ') + 1 for t in texts]
     
-    def process_image(self, file_path: str) -> Dict[str, Any]:
-        """Process an image file and extract text using OCR, along with metadata"""
+    def process_image(self, file_path: str, ocr_text: str = None) -> Dict[str, Any]:
+        """Process an image file and extract text using OCR, along with metadata.
+
+        When ocr_text is given (the async path already ran OCR), the
+        Tesseract call is skipped and the text is just normalized.
+        """
         file_path = Path(file_path)
         
         if not file_path.exists():
@@ -205,11 +430,27 @@ class DocumentProcessor:
                 metadata["mode"] = img.mode
                 
                 # Perform OCR to extract text from image
-                if OCR_AVAILABLE:
+                ocr_performed = ocr_text is not None or OCR_AVAILABLE
+                if ocr_text is not None:
+                    # OCR already ran (async path); just normalize the result
+                    extracted_text = ' '.join(ocr_text.split())
+                    if extracted_text:
+                        ocr_successful = True
+                        logger.info(f"Successfully extracted {len(extracted_text)} characters from image {file_path.name}")
+                    else:
+                        logger.info(f"No text found in image {file_path.name} via OCR")
+                elif OCR_AVAILABLE and not self._ocr_worth_trying(file_path, img):
+                    # Skip the OCR subprocess entirely for inputs that
+                    # cannot hold readable text
+                    ocr_performed = False
+                    logger.info(f"Skipping OCR for {file_path.name}: no extractable text expected")
+                elif OCR_AVAILABLE:
                     try:
+                        ocr_img = self._prepare_ocr_image(img)
+
                         # Extract text using Tesseract OCR
-                        extracted_text = pytesseract.image_to_string(img, lang='eng')
-                        
+                        extracted_text = pytesseract.image_to_string(ocr_img, lang='eng')
+
                         # Clean up the extracted text
                         if extracted_text:
                             extracted_text = extracted_text.strip()
@@ -250,7 +491,7 @@ class DocumentProcessor:
                     description = metadata_info
                 
                 # Add OCR status to metadata
-                metadata["ocr_performed"] = OCR_AVAILABLE
+                metadata["ocr_performed"] = ocr_performed
                 metadata["ocr_successful"] = ocr_successful
                 metadata["text_extracted_length"] = len(extracted_text) if extracted_text else 0
                 
@@ -265,7 +506,99 @@ class DocumentProcessor:
             "text": description,
             "metadata": metadata
         }
-    
+
+    @staticmethod
+    def _prepare_ocr_image(img):
+        """Downscale oversized photos and drop color before OCR.
+
+        Tesseract wants ~300 DPI grayscale and rescales internally
+        otherwise, costing far more than these millisecond transforms.
+        """
+        ocr_img = img
+        if max(ocr_img.size) > 2400:
+            ocr_img = ocr_img.copy()
+            ocr_img.thumbnail((2400, 2400), Image.LANCZOS)
+        if ocr_img.mode != 'L':
+            ocr_img = ocr_img.convert('L')
+        return ocr_img
+
+    def _prepare_ocr_file(self, file_path: Path) -> Optional[str]:
+        """Screen and preprocess an image for the OCR subprocess.
+
+        Returns None when OCR is not worth attempting (same heuristics as
+        the sync path). Otherwise the shared downscale/grayscale pass is
+        saved to a temp PNG the caller must delete after OCR -
+        aiopytesseract takes a path, not a PIL image.
+        """
+        with Image.open(file_path) as img:
+            if not self._ocr_worth_trying(file_path, img):
+                return None
+            ocr_img = self._prepare_ocr_image(img)
+            fd, tmp_path = tempfile.mkstemp(suffix='.png')
+            os.close(fd)
+            ocr_img.save(tmp_path, format='PNG')
+            return tmp_path
+
+    def _ocr_worth_trying(self, file_path: Path, img) -> bool:
+        """Decide whether OCR could plausibly find text in this image"""
+        if file_path.suffix.lower() == '.svg':
+            # Vector format; there is no raster for Tesseract to consume
+            return False
+        if img.width * img.height < 10_000:
+            # Icons and thumbnails never hold readable text
+            return False
+        return True
+
+    async def process_image_async(self, file_path: str) -> Dict[str, Any]:
+        """Process an image without blocking the event loop.
+
+        OCR goes through aiopytesseract's subprocess API when installed;
+        otherwise the sync path is pushed to a worker thread.
+        """
+        path = Path(file_path)
+        if not AIOPYTESSERACT_AVAILABLE or path.suffix.lower() == '.svg':
+            # The sync path handles the not-worth-OCR cases itself
+            return await asyncio.to_thread(self.process_image, file_path)
+
+        # Same downscale/grayscale pass as the sync path, off the loop;
+        # if the image cannot even be preprocessed, fall back to the sync
+        # path's own error handling
+        try:
+            tmp_path = await asyncio.to_thread(self._prepare_ocr_file, path)
+        except Exception as prep_error:
+            logger.warning(f"OCR preprocessing failed for {path.name}: {prep_error}")
+            return await asyncio.to_thread(self.process_image, file_path)
+
+        if tmp_path is None:
+            # Icons and thumbnails: skip the OCR subprocess; the sync path
+            # re-applies the heuristic, logs the skip and builds the
+            # metadata-only description
+            return await asyncio.to_thread(self.process_image, file_path)
+
+        try:
+            ocr_text = await aiopytesseract.image_to_string(tmp_path, lang='eng')
+        except Exception as ocr_error:
+            logger.warning(f"OCR failed for {path.name}: {ocr_error}")
+            ocr_text = ""
+        finally:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+        # Metadata extraction and description assembly are cheap but still
+        # touch the filesystem, so keep them off the loop too
+        return await asyncio.to_thread(self.process_image, file_path, ocr_text)
+
+    async def process_images_async(self, file_paths: List[str]) -> List[Dict[str, Any]]:
+        """Run OCR over a batch of images concurrently, capped at cpu_count"""
+        semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+
+        async def process_one(path: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.process_image_async(path)
+
+        return await asyncio.gather(*[process_one(p) for p in file_paths])
+
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """Get basic file information"""
         file_path = Path(file_path)
@@ -1,20 +1,48 @@
 from sentence_transformers import SentenceTransformer
+import asyncio
+import os
 import numpy as np
+from pathlib import Path
 from typing import List, Dict, Any
 import logging
 from utils import config
 
 logger = logging.getLogger(__name__)
 
+# Try to import the ONNX Runtime backend, but make it optional. An int8
+# ONNX export roughly halves model memory and speeds up CPU inference.
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 class EmbeddingService:
     def __init__(self):
         self.model_name = config.config.EMBEDDING_MODEL
         self.device = config.config.EMBEDDING_DEVICE
         self.model = None
+        self.onnx_model = None
+        self.tokenizer = None
         self._load_model()
-    
+
     def _load_model(self):
-        """Load the embedding model"""
+        """Load the embedding model (quantized ONNX export when available)"""
+        onnx_path = Path(config.config.EMBEDDING_ONNX_PATH)
+        if ONNX_AVAILABLE and onnx_path.exists():
+            try:
+                self.onnx_model = ORTModelForFeatureExtraction.from_pretrained(
+                    str(onnx_path), provider="CPUExecutionProvider"
+                )
+                self.tokenizer = AutoTokenizer.from_pretrained(str(onnx_path))
+                logger.info(f"Loaded ONNX embedding model from {onnx_path}")
+                return
+            except Exception as e:
+                logger.warning(f"Could not load ONNX embedding model: {e}")
+                self.onnx_model = None
+                self.tokenizer = None
+
         try:
             self.model = SentenceTransformer(
                 self.model_name,
@@ -24,13 +52,33 @@ class EmbeddingService:
         except Exception as e:
             logger.error(f"Error loading embedding model: {e}")
             raise
-    
+
+    def _encode_onnx(self, texts: List[str]) -> np.ndarray:
+        """Encode with the ONNX model: tokenize, mean-pool, L2-normalize
+        (the same pipeline sentence-transformers applies for MiniLM)"""
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=256, return_tensors="np"
+        )
+        outputs = self.onnx_model(**encoded)
+        token_embeddings = np.asarray(outputs.last_hidden_state, dtype=np.float32)
+
+        mask = encoded["attention_mask"][..., np.newaxis].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        counts = np.clip(mask.sum(axis=1), 1e-9, None)
+        embeddings = summed / counts
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.clip(norms, 1e-12, None)
+
     def encode_texts(self, texts: List[str]) -> np.ndarray:
         """Generate embeddings for a list of texts"""
-        if not self.model:
+        if not self.model and not self.onnx_model:
             raise RuntimeError("Embedding model not loaded")
-        
+
         try:
+            if self.onnx_model:
+                return self._encode_onnx(texts)
+
             embeddings = self.model.encode(
                 texts,
                 show_progress_bar=True,
@@ -44,7 +92,44 @@ class EmbeddingService:
     def encode_single_text(self, text: str) -> np.ndarray:
         """Generate embedding for a single text"""
         return self.encode_texts([text])[0]
-    
+
+    async def encode_single_text_async(self, text: str) -> np.ndarray:
+        """Generate embedding for a single text without blocking the event loop"""
+        return (await asyncio.to_thread(self.encode_texts, [text]))[0]
+
+    async def encode_chunks_async(self, chunks: List[Dict[str, Any]],
+                                  batch_size: int = 64) -> List[Dict[str, Any]]:
+        """Generate embeddings for document chunks off the event loop.
+
+        Encoding runs in a worker thread in mini-batches (sentence-transformers
+        length-sorts within each batch), so large documents don't stall
+        concurrent requests while they embed.
+        """
+        if not chunks:
+            return []
+
+        try:
+            texts = [chunk["text"] for chunk in chunks]
+            if self.onnx_model:
+                embeddings = await asyncio.to_thread(self._encode_onnx, texts)
+            else:
+                embeddings = await asyncio.to_thread(
+                    self.model.encode,
+                    texts,
+                    batch_size=batch_size,
+                    show_progress_bar=False,
+                    convert_to_numpy=True
+                )
+
+            for i, chunk in enumerate(chunks):
+                chunk["embedding"] = embeddings[i]
+
+            return chunks
+
+        except Exception as e:
+            logger.error(f"Error encoding chunks: {e}")
+            raise
+
     def encode_chunks(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Generate embeddings for document chunks"""
         if not chunks:
@@ -69,6 +154,8 @@ class EmbeddingService:
     
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings produced by the model"""
+        if self.onnx_model:
+            return self.onnx_model.config.hidden_size
         if not self.model:
             return None
         return self.model.get_sentence_embedding_dimension()
@@ -110,6 +197,15 @@ class EmbeddingService:
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the embedding model"""
+        if self.onnx_model:
+            return {
+                "model_name": self.model_name,
+                "loaded": True,
+                "device": "cpu",
+                "backend": "onnxruntime",
+                "embedding_dimension": self.get_embedding_dimension(),
+                "max_sequence_length": 256
+            }
         if not self.model:
             return {
                 "model_name": self.model_name,
@@ -5,6 +5,32 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+def _compile_keyword_alternation(keywords: List[str]) -> "re.Pattern":
+    """Compile a keyword list into one alternation regex.
+
+    A single C-level pass over the query replaces one Python substring
+    scan per keyword. Longer keywords come first so e.g. 'unit test'
+    wins over 'test', and lookarounds keep 'ai' from matching inside
+    'email' (keywords like 'c++' have no word boundary to anchor \\b on).
+    """
+    alternation = '|'.join(map(re.escape, sorted(keywords, key=len, reverse=True)))
+    return re.compile(r'(?<!\w)(?:' + alternation + r')(?!\w)', re.IGNORECASE)
+
+# Query tokens for set-based keyword matching; + # / keep keywords like
+# 'c++' and 'ci/cd' intact
+_TOKEN_PATTERN = re.compile(r"[a-z0-9+#/]+")
+
+def _partition_keywords(keywords: List[str]):
+    """Split a keyword list into single words and multi-word phrases.
+
+    Single words are matched by hash-set intersection against the
+    tokenized query — O(query tokens) regardless of list size — so only
+    the phrases still need a regex pass.
+    """
+    singles = frozenset(k for k in keywords if ' ' not in k)
+    phrases = [k for k in keywords if ' ' in k]
+    return singles, (_compile_keyword_alternation(phrases) if phrases else None)
+
 class IntentType(Enum):
     GENERAL = "general"
     CODE = "code"
@@ -60,6 +86,41 @@ class IntentClassifier:
             r'<html>', r'<div>', r'<span>', r'<script>',  # HTML tags
             r'\.py$', r'\.js$', r'\.java$', r'\.cpp$', r'\.sql$'  # File extensions
         ]
+
+        # Conversational patterns for general-intent scoring
+        self.conversational_patterns = [
+            r'\bhow are you\b', r'\bwhat\'s up\b', r'\btell me about\b',
+            r'\bcan you help\b', r'\bwhat do you think\b'
+        ]
+
+        # Phrases that suggest the user wants code written
+        self.code_phrases = [
+            'write a', 'create a', 'implement', 'function', 'class', 'method', 'algorithm'
+        ]
+
+        # General conversation indicators (the shorter list is what
+        # _find_general_indicators reports back in metadata)
+        self.general_indicators = [
+            'hello', 'hi', 'hey', 'thanks', 'thank you', 'please',
+            'joke', 'story', 'tell me', 'explain', 'help', 'what',
+            'how', 'why', 'when', 'where', 'who', 'can you'
+        ]
+        self.general_find_indicators = self.general_indicators[:11]
+
+        # Compile all patterns once; re.search with a raw pattern pays a
+        # cache lookup (and possible recompile) on every call
+        self._code_patterns_compiled = [re.compile(p, re.IGNORECASE) for p in self.code_patterns]
+        self._conversational_patterns_compiled = [re.compile(p, re.IGNORECASE) for p in self.conversational_patterns]
+
+        # Single-word keywords live in frozensets and are matched by set
+        # intersection on the tokenized query; only multi-word phrases
+        # keep an alternation regex
+        self._code_singles, self._code_phrases_pat = _partition_keywords(self.code_keywords)
+        self._technical_singles, self._technical_phrases_pat = _partition_keywords(self.technical_keywords)
+        self._document_singles, self._document_phrases_pat = _partition_keywords(self.document_keywords)
+        self._code_phrase_singles, self._code_phrase_phrases_pat = _partition_keywords(self.code_phrases)
+        self._general_singles, self._general_phrases_pat = _partition_keywords(self.general_indicators)
+        self._general_find_singles, self._general_find_phrases_pat = _partition_keywords(self.general_find_indicators)
     
     def classify_intent(self, query: str) -> Tuple[IntentType, float, Dict[str, any]]:
         """
@@ -69,40 +130,49 @@ class IntentClassifier:
             Tuple of (intent_type, confidence, metadata)
         """
         query_lower = query.lower().strip()
-        
+        # Tokenize once; every keyword branch intersects against this set
+        tokens = self._tokenize(query_lower)
+
+        # Each branch matches its keyword lists exactly once: the matches
+        # feed both the score and the returned metadata, so a threshold
+        # hit never re-runs the same matching to fill in the details
+
         # Check for code patterns first (highest priority)
-        code_score = self._calculate_code_score(query_lower)
+        patterns_found = self._find_code_patterns(query)
+        code_score = self._calculate_code_score(query_lower, patterns_found, tokens)
         if code_score > 0.7:
             return IntentType.CODE, code_score, {
                 'reason': 'Code patterns detected',
-                'patterns_found': self._find_code_patterns(query)
+                'patterns_found': patterns_found
             }
-        
+
         # Check for technical keywords
-        technical_score = self._calculate_technical_score(query_lower)
+        technical_found = self._find_technical_keywords(query_lower, tokens)
+        technical_score = min((len(technical_found) / len(self.technical_keywords)) * 0.8, 1.0)
         if technical_score > 0.6:
             return IntentType.TECHNICAL, technical_score, {
                 'reason': 'Technical keywords detected',
-                'keywords_found': self._find_technical_keywords(query_lower)
+                'keywords_found': technical_found
             }
-        
+
         # Check for document query indicators
-        document_score = self._calculate_document_score(query_lower)
+        document_found = self._find_document_keywords(query_lower, tokens)
+        document_score = min((len(document_found) / len(self.document_keywords)) * 0.7, 1.0)
         if document_score > 0.5:
             return IntentType.DOCUMENT_QUERY, document_score, {
                 'reason': 'Document query indicators detected',
-                'keywords_found': self._find_document_keywords(query_lower)
+                'keywords_found': document_found
             }
-        
+
         # Check for general conversation
-        general_score = self._calculate_general_score(query_lower)
+        general_score = self._calculate_general_score(query_lower, tokens)
         if general_score > 0.4:
             return IntentType.GENERAL, general_score, {
                 'reason': 'General conversation detected',
-                'indicators': self._find_general_indicators(query_lower)
+                'indicators': self._find_general_indicators(query_lower, tokens)
             }
-        
-        # Default to unknown
+
+        # Default to unknown; the scores dict is only assembled here
         return IntentType.UNKNOWN, 0.0, {
             'reason': 'No clear intent detected',
             'scores': {
@@ -113,58 +183,65 @@ class IntentClassifier:
             }
         }
     
-    def _calculate_code_score(self, query: str) -> float:
+    @staticmethod
+    def _tokenize(query: str) -> frozenset:
+        """Tokenize a lowercased query for set-based keyword matching"""
+        return frozenset(_TOKEN_PATTERN.findall(query))
+
+    def _match_keywords(self, query: str, tokens: frozenset, singles: frozenset, phrase_pattern) -> set:
+        """Keywords from one partitioned list that appear in the query"""
+        matches = set(tokens & singles)
+        if phrase_pattern:
+            matches.update(phrase_pattern.findall(query))
+        return matches
+
+    def _calculate_code_score(self, query: str, patterns_found: List[str] = None,
+                              tokens: frozenset = None) -> float:
         """Calculate score for code-related intent"""
         score = 0.0
-        
+        if tokens is None:
+            tokens = self._tokenize(query)
+
         # Check for code keywords
-        keyword_matches = sum(1 for keyword in self.code_keywords if keyword in query)
+        keyword_matches = len(self._match_keywords(query, tokens, self._code_singles, self._code_phrases_pat))
         if keyword_matches > 0:
             score += min(keyword_matches / 5.0, 1.0) * 0.6  # More lenient scoring
-        
-        # Check for code patterns
-        pattern_matches = sum(1 for pattern in self.code_patterns if re.search(pattern, query, re.IGNORECASE))
+
+        # Check for code patterns (reuse matches when the caller already ran them)
+        if patterns_found is None:
+            patterns_found = self._find_code_patterns(query)
+        pattern_matches = len(patterns_found)
         if pattern_matches > 0:
             score += min(pattern_matches / 3.0, 1.0) * 0.8  # Higher weight for patterns
-        
+
         # Check for specific code-related phrases
-        code_phrases = ['write a', 'create a', 'implement', 'function', 'class', 'method', 'algorithm']
-        phrase_matches = sum(1 for phrase in code_phrases if phrase in query)
+        phrase_matches = len(self._match_keywords(query, tokens, self._code_phrase_singles, self._code_phrase_phrases_pat))
         if phrase_matches > 0:
             score += min(phrase_matches / 3.0, 1.0) * 0.4
-        
+
         return min(score, 1.0)
-    
+
     def _calculate_technical_score(self, query: str) -> float:
         """Calculate score for technical intent"""
-        keyword_matches = sum(1 for keyword in self.technical_keywords if keyword in query)
+        keyword_matches = len(self._find_technical_keywords(query))
         return min((keyword_matches / len(self.technical_keywords)) * 0.8, 1.0)
-    
+
     def _calculate_document_score(self, query: str) -> float:
         """Calculate score for document query intent"""
-        keyword_matches = sum(1 for keyword in self.document_keywords if keyword in query)
+        keyword_matches = len(self._find_document_keywords(query))
         return min((keyword_matches / len(self.document_keywords)) * 0.7, 1.0)
-    
-    def _calculate_general_score(self, query: str) -> float:
+
+    def _calculate_general_score(self, query: str, tokens: frozenset = None) -> float:
         """Calculate score for general conversation intent"""
+        if tokens is None:
+            tokens = self._tokenize(query)
         # Simple heuristics for general conversation
-        general_indicators = [
-            'hello', 'hi', 'hey', 'thanks', 'thank you', 'please',
-            'joke', 'story', 'tell me', 'explain', 'help', 'what',
-            'how', 'why', 'when', 'where', 'who', 'can you'
-        ]
-        
-        indicator_matches = sum(1 for indicator in general_indicators if indicator in query)
+        indicator_matches = len(self._match_keywords(query, tokens, self._general_singles, self._general_phrases_pat))
         if indicator_matches > 0:
             return min(indicator_matches / 3.0, 1.0) * 0.8  # More lenient scoring
         
-        # Check for conversational patterns
-        conversational_patterns = [
-            r'\bhow are you\b', r'\bwhat\'s up\b', r'\btell me about\b',
-            r'\bcan you help\b', r'\bwhat do you think\b'
-        ]
-        
-        pattern_matches = sum(1 for pattern in conversational_patterns if re.search(pattern, query, re.IGNORECASE))
+        # Check for conversational patterns (compiled once at init)
+        pattern_matches = sum(1 for pattern in self._conversational_patterns_compiled if pattern.search(query))
         if pattern_matches > 0:
             return 0.6
         
@@ -173,26 +250,28 @@ class IntentClassifier:
     def _find_code_patterns(self, query: str) -> List[str]:
         """Find code patterns in the query"""
         found_patterns = []
-        for pattern in self.code_patterns:
-            if re.search(pattern, query, re.IGNORECASE):
-                found_patterns.append(pattern)
+        for raw, pattern in zip(self.code_patterns, self._code_patterns_compiled):
+            if pattern.search(query):
+                found_patterns.append(raw)
         return found_patterns
     
-    def _find_technical_keywords(self, query: str) -> List[str]:
+    def _find_technical_keywords(self, query: str, tokens: frozenset = None) -> List[str]:
         """Find technical keywords in the query"""
-        return [keyword for keyword in self.technical_keywords if keyword in query]
-    
-    def _find_document_keywords(self, query: str) -> List[str]:
+        if tokens is None:
+            tokens = self._tokenize(query)
+        return sorted(self._match_keywords(query, tokens, self._technical_singles, self._technical_phrases_pat))
+
+    def _find_document_keywords(self, query: str, tokens: frozenset = None) -> List[str]:
         """Find document keywords in the query"""
-        return [keyword for keyword in self.document_keywords if keyword in query]
-    
-    def _find_general_indicators(self, query: str) -> List[str]:
+        if tokens is None:
+            tokens = self._tokenize(query)
+        return sorted(self._match_keywords(query, tokens, self._document_singles, self._document_phrases_pat))
+
+    def _find_general_indicators(self, query: str, tokens: frozenset = None) -> List[str]:
         """Find general conversation indicators in the query"""
-        general_indicators = [
-            'hello', 'hi', 'hey', 'thanks', 'thank you', 'please',
-            'joke', 'story', 'tell me', 'explain', 'help'
-        ]
-        return [indicator for indicator in general_indicators if indicator in query]
+        if tokens is None:
+            tokens = self._tokenize(query)
+        return sorted(self._match_keywords(query, tokens, self._general_find_singles, self._general_find_phrases_pat))
     
     def get_intent_explanation(self, intent: IntentType, confidence: float, metadata: Dict) -> str:
         """Get a human-readable explanation of the intent classification"""
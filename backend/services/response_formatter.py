@@ -1,4 +1,51 @@
 import re
+import string
+
+# Patterns are compiled once at import time; the formatter runs on the
+# synchronous critical path after every LLM call, so the per-call re-cache
+# lookups add up
+_VERBOSE_PATTERNS = (
+    r'Based on the provided context,.*?[.!?]\s*',
+    r'According to the information provided,.*?[.!?]\s*',
+    r'The question asks.*?[.!?]\s*',
+    r'Therefore, the answer.*?[.!?]\s*',
+    r'In conclusion,.*?[.!?]\s*',
+    r'To summarize,.*?[.!?]\s*',
+    r'Let me explain.*?[.!?]\s*',
+    r'I can help you.*?[.!?]\s*',
+    r'Here\'s what.*?[.!?]\s*',
+)
+_REPETITIVE_PATTERNS = (
+    r'(?:Please provide.*?\.\s*)+',
+    r'(?:Answer:.*?\.\s*)+',
+    r'(?:Note:.*?\.\s*)+',
+)
+# One alternation so cleanup is a single scan of the response instead of a
+# dozen full passes; the verbose intros keep their original DOTALL and
+# IGNORECASE semantics via scoped inline flags
+_REMOVE_PATTERNS = re.compile(
+    '|'.join(
+        [f'(?si:{p})' for p in _VERBOSE_PATTERNS] + list(_REPETITIVE_PATTERNS)
+    )
+)
+# Both whitespace fixes in one pass: blank-line runs collapse to one blank
+# line, space runs collapse to one space
+_WHITESPACE_RUNS = re.compile(r'(\n\s*\n\s*\n+)|(?: {2,})')
+
+def _collapse_whitespace(match: "re.Match") -> str:
+    return '\n\n' if match.group(1) else ' '
+_SENTENCE_SPLIT = re.compile(r'[.!?]+\s+')
+# Dedup normalization strips punctuation in C via str.translate instead of
+# running two regex substitutions per sentence
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation)
+_EXAMPLE_MARKER = re.compile(r'(For example:|Example:).*?(?=\.|$)', re.IGNORECASE | re.DOTALL)
+_BOLD_HEADER = re.compile(r'\*\*([^*]+)\*\*')
+_BULLET_PREFIX = re.compile(r'^[\*\-\•]\s*')
+_NUMBERED_LINE = re.compile(r'^\d+\.')
+_DOUBLE_BLANK = re.compile(r'\n\s*\n\s*\n')
+_FENCED_CODE = re.compile(r'```.*?\n(.*?)```', re.DOTALL)
+_PYTHON_FUNCTION = re.compile(r'def\s+\w+.*?(?=\n(?:def|\Z))', re.DOTALL)
+_LINE_BULLET = re.compile(r'^\s*[\*\-\•]\s*', re.MULTILINE)
 
 class ResponseFormatter:
     def __init__(self, max_response_length: int = 800):  # Balanced limit for concise responses
@@ -33,47 +80,28 @@ class ResponseFormatter:
     
     def _clean_response(self, response: str) -> str:
         """Clean up common response issues with aggressive trimming"""
-        # Remove verbose introductory phrases
-        verbose_patterns = [
-            r'Based on the provided context,.*?[.!?]\s*',
-            r'According to the information provided,.*?[.!?]\s*',
-            r'The question asks.*?[.!?]\s*',
-            r'Therefore, the answer.*?[.!?]\s*',
-            r'In conclusion,.*?[.!?]\s*',
-            r'To summarize,.*?[.!?]\s*',
-            r'Let me explain.*?[.!?]\s*',
-            r'I can help you.*?[.!?]\s*',
-            r'Here\'s what.*?[.!?]\s*'
-        ]
-        
-        for pattern in verbose_patterns:
-            response = re.sub(pattern, '', response, flags=re.DOTALL | re.IGNORECASE)
-        
+        # Remove verbose introductory and repetitive phrases in one scan
+        response = _REMOVE_PATTERNS.sub('', response)
+
         # Remove repetitive content more aggressively
         sentences = self._split_sentences(response)
         unique_sentences = self._remove_duplicate_sentences(sentences)
         response = ' '.join(unique_sentences)
-        
+
         # Remove excessive examples and explanations
         response = self._trim_examples(response)
-        
-        # Remove repetitive text patterns
-        response = re.sub(r'(Please provide.*?\.\s*)+', '', response)
-        response = re.sub(r'(Answer:.*?\.\s*)+', '', response)
-        response = re.sub(r'(Note:.*?\.\s*)+', '', response)
-        
+
         # No truncation - preserve all content
-        
+
         # Clean up whitespace
-        response = re.sub(r'\n\s*\n\s*\n+', '\n\n', response)
-        response = re.sub(r' +', ' ', response)
+        response = _WHITESPACE_RUNS.sub(_collapse_whitespace, response)
         
         return response.strip()
     
     def _split_sentences(self, text: str) -> list:
         """Split text into sentences"""
         # Simple sentence splitting
-        sentences = re.split(r'[.!?]+\s+', text)
+        sentences = _SENTENCE_SPLIT.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
     def _remove_duplicate_sentences(self, sentences: list) -> list:
@@ -83,8 +111,7 @@ class ResponseFormatter:
         
         for sentence in sentences:
             # Normalize for comparison
-            normalized = re.sub(r'[^\w\s]', '', sentence.lower()).strip()
-            normalized = re.sub(r'\s+', ' ', normalized)
+            normalized = ' '.join(sentence.lower().translate(_PUNCT_TABLE).split())
             
             if normalized and normalized not in seen_normalized:
                 seen_normalized.add(normalized)
@@ -95,8 +122,7 @@ class ResponseFormatter:
     def _trim_examples(self, response: str) -> str:
         """Remove excessive examples and keep only the first one"""
         # Find patterns like "For example:" or "Example:"
-        example_pattern = r'(For example:|Example:).*?(?=\.|$)'
-        examples = re.findall(example_pattern, response, re.IGNORECASE | re.DOTALL)
+        examples = _EXAMPLE_MARKER.findall(response)
         
         if len(examples) > 1:
             # Keep only the first example
@@ -109,7 +135,7 @@ class ResponseFormatter:
     def _format_technical_response(self, response: str) -> str:
         """Format technical responses with proper markdown structure"""
         # Clean up the response first
-        response = re.sub(r'\*\*([^*]+)\*\*', r'**\1**', response)  # Fix headers
+        response = _BOLD_HEADER.sub(r'**\1**', response)  # Fix headers
         
         # Split into lines and process each one
         lines = response.split('\n')
@@ -131,11 +157,11 @@ class ResponseFormatter:
             elif line.startswith('•') or line.startswith('*') or line.startswith('-'):
                 if bullet_count < max_bullets:
                     # Convert to markdown bullet
-                    bullet_text = re.sub(r'^[\*\-\•]\s*', '', line)
+                    bullet_text = _BULLET_PREFIX.sub('', line)
                     formatted_lines.append(f'- {bullet_text}')
                     bullet_count += 1
             # Handle numbered lists - convert to markdown numbered lists
-            elif re.match(r'^\d+\.', line):
+            elif _NUMBERED_LINE.match(line):
                 formatted_lines.append(line)  # Keep as is for markdown
             else:
                 # Regular text - preserve all content
@@ -143,20 +169,20 @@ class ResponseFormatter:
         
         # Join lines and clean up spacing
         result = '\n'.join(formatted_lines)
-        result = re.sub(r'\n\s*\n\s*\n', '\n\n', result)  # Clean up excessive spacing
+        result = _DOUBLE_BLANK.sub('\n\n', result)  # Clean up excessive spacing
         
         return result
     
     def _format_code_response(self, response: str) -> str:
         """Format code responses with proper markdown code blocks"""
         # Look for code blocks first
-        code_match = re.search(r'```.*?\n(.*?)```', response, re.DOTALL)
+        code_match = _FENCED_CODE.search(response)
         if code_match:
             code_content = code_match.group(1).strip()
             return f'```python\n{code_content}\n```'
         
         # Extract the main function/code block
-        code_match = re.search(r'def\s+\w+.*?(?=\n(?:def|\Z))', response, re.DOTALL)
+        code_match = _PYTHON_FUNCTION.search(response)
         if code_match:
             code_content = code_match.group(0).strip()
             return f'```python\n{code_content}\n```'
@@ -175,7 +201,7 @@ class ResponseFormatter:
         formatted_response = '. '.join(sentences) + '.' if sentences else response
         
         # Convert any bullet points to markdown format
-        formatted_response = re.sub(r'^\s*[\*\-\•]\s*', '- ', formatted_response, flags=re.MULTILINE)
+        formatted_response = _LINE_BULLET.sub('- ', formatted_response)
         
         return formatted_response
     
@@ -189,7 +215,7 @@ class ResponseFormatter:
         formatted_response = '. '.join(sentences) + '.' if sentences else response
         
         # Convert any bullet points to markdown format
-        formatted_response = re.sub(r'^\s*[\*\-\•]\s*', '- ', formatted_response, flags=re.MULTILINE)
+        formatted_response = _LINE_BULLET.sub('- ', formatted_response)
         
         return formatted_response
     
@@ -0,0 +1,150 @@
+import faiss
+import numpy as np
+import time
+import logging
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """Semantic cache for query responses.
+
+    Stores normalized query embeddings in a small FAISS inner-product index so
+    that semantically duplicate questions can reuse a previous answer instead
+    of re-running LLM generation.
+    """
+
+    def __init__(self, dimension: int, threshold: float = 0.95,
+                 max_entries: int = 10000, ttl_seconds: int = 3600):
+        self.dimension = dimension
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        # Inner product on normalized vectors == cosine similarity
+        self.index = faiss.IndexFlatIP(dimension)
+        self.entries: List[Dict[str, Any]] = []
+
+        self.hits = 0
+        self.misses = 0
+
+        # Answers are only valid against the document set they were generated
+        # from; bumping the version on ingest/delete invalidates older entries
+        # without an eager index rebuild
+        self.corpus_version = 0
+
+    def _normalize(self, embedding: np.ndarray) -> np.ndarray:
+        """Normalize an embedding for cosine similarity via inner product"""
+        embedding = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+        return embedding
+
+    def lookup(self, query_embedding: np.ndarray, threshold: float = None) -> Optional[Dict[str, Any]]:
+        """Look up a cached response for a semantically similar query"""
+        if threshold is None:
+            threshold = self.threshold
+
+        if self.index.ntotal == 0:
+            self.misses += 1
+            return None
+
+        try:
+            query = self._normalize(query_embedding)
+            similarities, indices = self.index.search(query, 1)
+            similarity = float(similarities[0][0])
+            idx = int(indices[0][0])
+
+            if idx < 0 or idx >= len(self.entries) or similarity < threshold:
+                self.misses += 1
+                return None
+
+            entry = self.entries[idx]
+
+            # Expired entries are treated as misses; they get dropped on the
+            # next rebuild rather than eagerly (FAISS has no cheap deletion)
+            if time.time() - entry["created_at"] > self.ttl_seconds:
+                self.misses += 1
+                return None
+
+            # Entries generated against an older document set may cite
+            # removed sources or miss new ones
+            if entry.get("corpus_version") != self.corpus_version:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            logger.info(f"Semantic cache hit (similarity: {similarity:.3f})")
+            return entry
+
+        except Exception as e:
+            logger.error(f"Error looking up semantic cache: {e}")
+            self.misses += 1
+            return None
+
+    def add(self, query_embedding: np.ndarray, answer: str,
+            sources: List[Dict[str, Any]], images: List[Dict[str, Any]],
+            intent: str = None):
+        """Cache a generated response keyed by its query embedding"""
+        try:
+            if len(self.entries) >= self.max_entries:
+                self._evict_stale()
+
+            self.index.add(self._normalize(query_embedding))
+            self.entries.append({
+                "answer": answer,
+                "sources": sources,
+                "images": images,
+                "intent": intent,
+                "created_at": time.time(),
+                "corpus_version": self.corpus_version
+            })
+        except Exception as e:
+            logger.error(f"Error adding to semantic cache: {e}")
+
+    def _evict_stale(self):
+        """Rebuild the index keeping only the freshest half of the entries"""
+        now = time.time()
+        keep = [
+            (i, entry) for i, entry in enumerate(self.entries)
+            if now - entry["created_at"] <= self.ttl_seconds
+        ]
+        # Still over capacity after dropping expired entries: keep newest half
+        if len(keep) >= self.max_entries:
+            keep = keep[len(keep) // 2:]
+        # Entries from older corpus versions can never hit again
+        keep = [
+            (i, entry) for i, entry in keep
+            if entry.get("corpus_version") == self.corpus_version
+        ]
+
+        new_index = faiss.IndexFlatIP(self.dimension)
+        if keep:
+            vectors = np.vstack([self.index.reconstruct(i) for i, _ in keep])
+            new_index.add(vectors)
+
+        self.index = new_index
+        self.entries = [entry for _, entry in keep]
+        logger.info(f"Semantic cache evicted stale entries (kept {len(self.entries)})")
+
+    def bump_corpus_version(self):
+        """Invalidate cached answers after the document set changes"""
+        self.corpus_version += 1
+        logger.info(f"Semantic cache corpus version bumped to {self.corpus_version}")
+
+    def clear(self):
+        """Clear all cached responses"""
+        self.index = faiss.IndexFlatIP(self.dimension)
+        self.entries = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total > 0 else 0.0,
+            "threshold": self.threshold
+        }
@@ -1,7 +1,9 @@
+import asyncio
 import faiss
 import numpy as np
 import pickle
 import json
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 import logging
@@ -10,6 +12,17 @@ from utils import config
 logger = logging.getLogger(__name__)
 
 class VectorStore:
+    # HNSW graph parameters: connectivity trades index size for recall,
+    # efConstruction build quality, efSearch runtime recall vs. speed
+    HNSW_CONNECTIVITY = 32
+    HNSW_EF_CONSTRUCTION = 64
+    HNSW_EF_SEARCH = 100
+
+    # Write-behind batching: coalesce concurrent add_documents calls into one
+    # index insert + one disk save per window instead of one save per upload
+    WRITE_FLUSH_INTERVAL = 0.5  # seconds
+    WRITE_FLUSH_VECTORS = 1024
+
     def __init__(self, dimension: int = None):
         self.index_path = Path(config.config.VECTOR_STORE_PATH)
         self.index_file = self.index_path / "faiss_index.bin"
@@ -19,7 +32,17 @@ class VectorStore:
         self.index = None
         self.metadata = []
         self.dimension = dimension
-        
+
+        # Write-behind queue state (started lazily from an async context)
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+        # FAISS releases the GIL inside its C++ calls and concurrent
+        # add/search on one HNSW index is not thread-safe, so the writer
+        # thread's adds and the event loop's searches serialize here.
+        # Reentrant because delete falls back to clear() under the lock.
+        self._index_lock = threading.RLock()
+
         # Ensure directory exists
         self.index_path.mkdir(parents=True, exist_ok=True)
         
@@ -45,15 +68,33 @@ class VectorStore:
     def _create_new_index(self, dimension: int):
         """Create new FAISS index"""
         try:
-            # Use L2 distance (Euclidean)
-            self.index = faiss.IndexFlatL2(dimension)
+            # HNSW graph index: sub-linear approximate search instead of the
+            # brute-force O(N*d) scan of IndexFlatL2, with incremental adds.
+            # Stored vectors are scalar-quantized (fp16 by default) to halve
+            # the memory streamed per search; queries stay fp32 on input.
+            quantization = config.config.VECTOR_QUANTIZATION.lower()
+            if quantization == "int8":
+                self.index = faiss.IndexHNSWSQ(
+                    dimension, faiss.ScalarQuantizer.QT_8bit, self.HNSW_CONNECTIVITY
+                )
+                index_type = "IndexHNSWSQ_int8"
+            elif quantization == "fp16":
+                self.index = faiss.IndexHNSWSQ(
+                    dimension, faiss.ScalarQuantizer.QT_fp16, self.HNSW_CONNECTIVITY
+                )
+                index_type = "IndexHNSWSQ_fp16"
+            else:
+                self.index = faiss.IndexHNSWFlat(dimension, self.HNSW_CONNECTIVITY)
+                index_type = "IndexHNSWFlat"
+            self.index.hnsw.efConstruction = self.HNSW_EF_CONSTRUCTION
+            self.index.hnsw.efSearch = self.HNSW_EF_SEARCH
             self.metadata = []
             self.dimension = dimension
-            
+
             # Save initial configuration
             config_data = {
                 "dimension": dimension,
-                "index_type": "IndexFlatL2",
+                "index_type": index_type,
                 "created_at": str(Path().resolve())
             }
             
@@ -122,83 +163,182 @@ class VectorStore:
                 chunk_metadata.append(metadata)
             
             embeddings = np.array(embeddings).astype(np.float32)
-            
-            # Create index if it doesn't exist
-            if self.index is None:
-                dimension = embeddings.shape[1]
-                self._create_new_index(dimension)
-            
-            # Store current state for rollback
-            old_index_ntotal = self.index.ntotal
-            old_metadata_count = len(self.metadata)
-            
-            try:
-                # Add embeddings to index
-                self.index.add(embeddings)
-                
-                # Add metadata
-                self.metadata.extend(chunk_metadata)
-                
-                # CRITICAL: Verify synchronization immediately
-                if self.index.ntotal != len(self.metadata):
-                    logger.error(f"CRITICAL: Vector/metadata mismatch detected! "
-                               f"Vectors: {self.index.ntotal}, Metadata: {len(self.metadata)}")
-                    
-                    # Rollback: Restore previous state
-                    logger.error("Rolling back due to mismatch")
-                    
-                    # Remove added vectors (this is tricky with FAISS, so we'll clear and rebuild)
-                    logger.error("Clearing index due to mismatch - will need to rebuild")
-                    self.clear()
-                    raise ValueError("Vector/metadata mismatch - index cleared for safety")
-                
-                # Save to disk only if synchronization is verified
-                self._save_index()
-                
-                logger.info(f"✅ Added {len(chunks)} chunks to vector store "
-                          f"(total: {self.index.ntotal} vectors, {len(self.metadata)} metadata)")
-                
-            except Exception as e:
-                # Rollback on any error
-                logger.error(f"Error during add_documents: {e}")
-                # If we have a mismatch, clear everything to prevent corruption
-                if "mismatch" in str(e).lower():
-                    logger.error("Clearing index due to mismatch")
-                    self.clear()
-                raise
+
+            with self._index_lock:
+                # Create index if it doesn't exist
+                if self.index is None:
+                    dimension = embeddings.shape[1]
+                    self._create_new_index(dimension)
+
+                # Store current state for rollback
+                old_index_ntotal = self.index.ntotal
+                old_metadata_count = len(self.metadata)
+
+                try:
+                    # Scalar-quantized indexes need a one-off calibration pass
+                    # before the first add (no-op for flat indexes)
+                    if not self.index.is_trained:
+                        self.index.train(embeddings)
+
+                    # Add embeddings to index
+                    self.index.add(embeddings)
+
+                    # Add metadata
+                    self.metadata.extend(chunk_metadata)
+
+                    # CRITICAL: Verify synchronization immediately
+                    if self.index.ntotal != len(self.metadata):
+                        logger.error(f"CRITICAL: Vector/metadata mismatch detected! "
+                                   f"Vectors: {self.index.ntotal}, Metadata: {len(self.metadata)}")
+
+                        # Rollback: Restore previous state
+                        logger.error("Rolling back due to mismatch")
+
+                        # Remove added vectors (this is tricky with FAISS, so we'll clear and rebuild)
+                        logger.error("Clearing index due to mismatch - will need to rebuild")
+                        self.clear()
+                        raise ValueError("Vector/metadata mismatch - index cleared for safety")
+
+                    # Save to disk only if synchronization is verified
+                    self._save_index()
+
+                    logger.info(f"✅ Added {len(chunks)} chunks to vector store "
+                              f"(total: {self.index.ntotal} vectors, {len(self.metadata)} metadata)")
+
+                except Exception as e:
+                    # Rollback on any error
+                    logger.error(f"Error during add_documents: {e}")
+                    # If we have a mismatch, clear everything to prevent corruption
+                    if "mismatch" in str(e).lower():
+                        logger.error("Clearing index due to mismatch")
+                        self.clear()
+                    raise
             
         except Exception as e:
             logger.error(f"Error adding documents to vector store: {e}")
             raise
     
-    def search(self, query_embedding: np.ndarray, top_k: int = None) -> List[Dict[str, Any]]:
+    def start_writer(self):
+        """Start the write-behind batcher (call once from an async context)"""
+        if self._writer_task is None:
+            self._write_queue = asyncio.Queue()
+            self._writer_task = asyncio.create_task(self._writer_loop())
+            logger.info("Started vector store write-behind batcher")
+
+    async def stop_writer(self):
+        """Flush pending writes and stop the write-behind batcher"""
+        if self._writer_task is None:
+            return
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        self._writer_task = None
+
+        # Flush anything still queued so no accepted write is lost
+        batch = []
+        futures = []
+        while not self._write_queue.empty():
+            chunks, future = self._write_queue.get_nowait()
+            batch.extend(chunks)
+            futures.append(future)
+        if batch:
+            try:
+                await asyncio.to_thread(self.add_documents, batch)
+                for future in futures:
+                    if not future.done():
+                        future.set_result(None)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    async def add_documents_async(self, chunks: List[Dict[str, Any]]):
+        """Enqueue chunks for the write-behind batcher and wait until the
+        batch containing them has been added and saved to disk.
+
+        Falls back to a direct threaded add when the batcher is not running
+        (e.g. scripts that use VectorStore outside the app lifecycle)."""
+        if not chunks:
+            return
+        if self._write_queue is None:
+            await asyncio.to_thread(self.add_documents, chunks)
+            return
+        future = asyncio.get_running_loop().create_future()
+        await self._write_queue.put((chunks, future))
+        await future
+
+    async def _writer_loop(self):
+        """Drain the write queue, coalescing adds that arrive within the
+        flush window into a single index insert and disk save"""
+        loop = asyncio.get_running_loop()
+        while True:
+            chunks, future = await self._write_queue.get()
+            batch = list(chunks)
+            futures = [future]
+
+            # Keep collecting until the window closes or the batch is large
+            deadline = loop.time() + self.WRITE_FLUSH_INTERVAL
+            while len(batch) < self.WRITE_FLUSH_VECTORS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    chunks, future = await asyncio.wait_for(
+                        self._write_queue.get(), timeout
+                    )
+                except asyncio.TimeoutError:
+                    break
+                batch.extend(chunks)
+                futures.append(future)
+
+            try:
+                await asyncio.to_thread(self.add_documents, batch)
+                for future in futures:
+                    if not future.done():
+                        future.set_result(None)
+            except Exception as e:
+                logger.error(f"Write-behind batch failed: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def search(self, query_embedding: np.ndarray, top_k: int = None, ef_search: int = None) -> List[Dict[str, Any]]:
         """Search for similar documents"""
         if top_k is None:
             top_k = config.TOP_K_RESULTS
-        
+
         if self.index is None or self.index.ntotal == 0:
             return []
-        
+
         try:
             # Ensure query embedding is the right shape and type
             query_embedding = np.array([query_embedding]).astype(np.float32)
-            
-            # Search in FAISS index
-            distances, indices = self.index.search(query_embedding, top_k)
-            
-            # Prepare results
-            results = []
-            for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-                # Only include results that have valid metadata
-                if idx < len(self.metadata):
-                    result = self.metadata[idx].copy()
-                    result["similarity_score"] = float(1 / (1 + distance))  # Convert distance to similarity
-                    result["rank"] = i + 1
-                    results.append(result)
-                else:
-                    # Log warning for invalid indices
-                    logger.warning(f"Search returned invalid index {idx} (metadata count: {len(self.metadata)})")
-            
+
+            with self._index_lock:
+                # Tune HNSW search effort relative to top_k (legacy flat indexes
+                # loaded from disk have no hnsw attribute and search exhaustively)
+                if hasattr(self.index, "hnsw"):
+                    self.index.hnsw.efSearch = ef_search or max(self.HNSW_EF_SEARCH, top_k * 4)
+
+                # Search in FAISS index
+                distances, indices = self.index.search(query_embedding, top_k)
+
+                # Prepare results (metadata reads stay under the lock so a
+                # concurrent delete's rebuild can't shift positions mid-read)
+                results = []
+                for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
+                    # Only include results that have valid metadata
+                    if idx < len(self.metadata):
+                        result = self.metadata[idx].copy()
+                        result["similarity_score"] = float(1 / (1 + distance))  # Convert distance to similarity
+                        result["rank"] = i + 1
+                        results.append(result)
+                    else:
+                        # Log warning for invalid indices
+                        logger.warning(f"Search returned invalid index {idx} (metadata count: {len(self.metadata)})")
+
             return results
             
         except Exception as e:
@@ -219,57 +359,74 @@ class VectorStore:
     def clear(self):
         """Clear all data from vector store"""
         try:
-            if self.index_file.exists():
-                self.index_file.unlink()
-            if self.metadata_file.exists():
-                self.metadata_file.unlink()
-            if self.config_file.exists():
-                self.config_file.unlink()
-            
-            self.index = None
-            self.metadata = []
-            self.dimension = None
-            
+            with self._index_lock:
+                if self.index_file.exists():
+                    self.index_file.unlink()
+                if self.metadata_file.exists():
+                    self.metadata_file.unlink()
+                if self.config_file.exists():
+                    self.config_file.unlink()
+
+                self.index = None
+                self.metadata = []
+                self.dimension = None
+
             logger.info("Cleared vector store")
         except Exception as e:
             logger.error(f"Error clearing vector store: {e}")
             raise
     
-    def delete_by_filename(self, filename: str) -> int:
-        """Delete all chunks belonging to a specific file"""
-        # Note: FAISS doesn't support deletion efficiently
-        # This is a simplified implementation
-        indices_to_remove = []
-        
-        for i, metadata in enumerate(self.metadata):
-            if metadata.get("metadata", {}).get("file_name") == filename:
-                indices_to_remove.append(i)
-        
-        if not indices_to_remove:
+    def delete_by_filenames(self, filenames: List[str]) -> int:
+        """Delete chunks for several files and rebuild the index to match.
+
+        FAISS has no cheap deletion, so the surviving vectors are
+        reconstructed from the old index and re-added to a fresh one -
+        keeping vector positions aligned with metadata, which search
+        (and the add-time sync check) relies on.
+        """
+        names = set(filenames)
+        if not names:
             return 0
-        
-        # Rebuild index without deleted items
-        if self.index and self.index.ntotal > 0:
-            # Get all embeddings
-            all_embeddings = []
-            new_metadata = []
-            
-            for i in range(len(self.metadata)):
-                if i not in indices_to_remove:
-                    # This is a limitation - we can't easily get embeddings back from FAISS
-                    # In production, you'd want to store embeddings separately
-                    new_metadata.append(self.metadata[i])
-            
-            # Update metadata
-            self.metadata = new_metadata
-            
-            # Save updated index
-            if self.metadata:
-                self._save_index()
-            else:
+
+        with self._index_lock:
+            if not self.metadata:
+                return 0
+
+            keep = [
+                i for i, md in enumerate(self.metadata)
+                if md.get("metadata", {}).get("file_name") not in names
+            ]
+            removed = len(self.metadata) - len(keep)
+            if not removed:
+                return 0
+
+            if not keep or self.index is None or self.index.ntotal == 0:
                 self.clear()
-            
-            logger.info(f"Deleted {len(indices_to_remove)} chunks for file: {filename}")
-            return len(indices_to_remove)
-        
-        return 0
+                logger.info(f"Deleted {removed} chunks for {len(names)} files")
+                return removed
+
+            try:
+                vectors = np.vstack(
+                    [self.index.reconstruct(i) for i in keep]
+                ).astype(np.float32)
+                surviving_metadata = [self.metadata[i] for i in keep]
+
+                self._create_new_index(self.dimension)
+                # Scalar-quantized indexes need calibration before the
+                # first add, same as the add_documents path
+                if not self.index.is_trained:
+                    self.index.train(vectors)
+                self.index.add(vectors)
+                self.metadata = surviving_metadata
+                self._save_index()
+            except Exception as e:
+                logger.error(f"Error rebuilding index after delete: {e}")
+                raise
+
+        logger.info(f"Deleted {removed} chunks for {len(names)} files")
+        return removed
+
+    def delete_by_filename(self, filename: str) -> int:
+        """Delete all chunks belonging to a specific file"""
+        # Single-file case of the bulk delete, sharing its index rebuild
+        return self.delete_by_filenames([filename])
@@ -14,6 +14,10 @@ class Config:
     # Ollama Configuration
     OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11435")
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2:1b")
+    # Client-side concurrency cap; should match the daemon's
+    # OLLAMA_NUM_PARALLEL so concurrent routes batch in one KV pass
+    # instead of queueing server-side
+    OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))
     
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
@@ -42,12 +46,17 @@ class Config:
    
     # Vector Store Configuration - Optimized for better context
     VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", "./data/vector_store")
+    # Stored-vector precision: "fp16", "int8", or "fp32" (no quantization)
+    VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "fp16")
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", 400))  # Larger chunks for better context
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 80))  # More overlap for continuity
    
     # Embedding Configuration
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
     EMBEDDING_DEVICE = os.getenv("EMBEDDING_DEVICE", "cpu")
+    # Directory holding an int8 ONNX export (see export_onnx_model.py);
+    # used automatically when present and optimum[onnxruntime] is installed
+    EMBEDDING_ONNX_PATH = os.getenv("EMBEDDING_ONNX_PATH", "./model_cache/onnx-int8")
     
     # OPTIMIZED Model settings for shorter responses
     MODEL_NAME = "llama3.2:1b"